@@ -4,20 +4,30 @@ Manages player evaluations and shows average values of players
 SYNOPSIS
 ========
 ::
-python main.py
+python main.py [--profile-startup] [--instrument] [--log-level LEVEL]
 
 DESCRIPTION
 ===========
 Import evaluations MagicCup files and shows players values as
 fanta_vote average, vote average, rate of played matches,
-player cost
+player cost.
+The window is shown first and the data is loaded in background;
+with --profile-startup the time of every startup step is printed.
+With --instrument calls, time and queries of the Model methods and of
+the main operations are recorded and printed at exit.
+--log-level sets the level of the log records (default INFO, DEBUG to
+log every imported row).
 
 Modules
 =====
 Django for ORM and db
 Wxfor graphics
 """
+import time
+START = time.perf_counter()
 
+import argparse
+import logging
 import os
 
 # Django specific settings
@@ -34,30 +44,75 @@ VENV_PATH = '/venv/Lib/site-packages' if platform.system() == 'Linux' else\
              r'\venv\Lib\site-packages'
 sys.path.append(os.getcwd() + VENV_PATH)
 
-# noinspection PyUnresolvedReferences
-from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
+from players.startup import StartupTimer
+
+parser = argparse.ArgumentParser(description="FantaStat")
+parser.add_argument('--profile-startup', action='store_true',
+                    help='print the time of every startup step')
+parser.add_argument('--instrument', action='store_true',
+                    help='print calls, time and queries of the Model methods '
+                         'and of the main operations at exit')
+parser.add_argument('--log-level',
+                    choices=('DEBUG', 'INFO', 'WARNING', 'ERROR'),
+                    help='level of the log records, by default the LOGGING '
+                         'setting one')
+args = parser.parse_args()
+timer = StartupTimer(enabled=args.profile_startup, start=START)
+timer.mark('python startup')
+
+# ORM only: no WSGI application is needed by a desktop application
+import django
+django.setup()
+timer.mark('django setup')
+logger = logging.getLogger('main')
+if args.log_level:
+    logging.getLogger().setLevel(args.log_level)
+if args.instrument:
+    from players.instrument import install
+    install()
 
 import wx
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 from players.controller import Controller
+timer.mark('wx and controller imports')
 
 
 class App(wx.App):
+    def __init__(self, timer):
+        self.timer = timer
+        super(App, self).__init__(False)
+
     # noinspection PyPep8Naming,PyMethodMayBeStatic
     def OnInit(self):
-        from settings import DATABASES
-        db = DATABASES.get('default').get('NAME')
-        if db not in os.listdir(os.getcwd()):
-            from django.core.management import call_command
-            print("INFO: db 'players.db' not found")
-            print("INFO: invoking django 'makemigrations' command...")
-            call_command("makemigrations", interactive=False)
-            print("INFO: invoking django 'migrate' command...")
+        db = settings.DATABASES.get('default').get('NAME')
+        if not os.path.exists(db):
+            logger.info("db '%s' not found, invoking django 'migrate' "
+                        "command...", db)
+            call_command("migrate", interactive=False)
+            self.timer.mark('database creation')
+        elif has_pending_migrations():
+            logger.info("db '%s' not up to date, invoking django 'migrate' "
+                        "command...", db)
             call_command("migrate", interactive=False)
-        Controller()
+            self.timer.mark('database migration')
+        Controller(timer=self.timer)
         return True
 
 
+def has_pending_migrations():
+    """
+    has_pending_migrations() -> boolean
+
+    It returns True if some migration of the project has not been applied
+    to the existing database
+    """
+    executor = MigrationExecutor(connection)
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
 if __name__ == '__main__':
-    app = App(False)
+    app = App(timer)
     app.MainLoop()
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+class PlayersConfig(AppConfig):
+    name = 'players'
+
+    def ready(self):
+        from players.db import on_connection_created
+        connection_created.connect(on_connection_created)
+        if getattr(settings, 'INSTRUMENT', False):
+            from players.instrument import install
+            install()
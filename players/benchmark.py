@@ -0,0 +1,385 @@
+"""
+Benchmarks of the import and statistics paths, run by the 'benchmark'
+management command on scratch databases, so the configured database
+is never touched.
+"""
+import glob
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from players.controller import Controller
+from players.importer import Importer, get_day_from_path
+from players.model import IGNORE, UPDATE, Model
+from players.parser import iter_file
+from players.progress import ConsoleProgress, Progress
+
+DAYS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'days')
+REPEAT = 3  # the best time of REPEAT runs is reported
+
+
+@contextmanager
+def scratch_database():
+    """
+    scratch_database()
+
+    It runs the block on a new migrated database in a temporary file,
+    which is destroyed at the end
+    """
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    tmp_dir = tempfile.mkdtemp()
+    test_settings['NAME'] = os.path.join(tmp_dir, 'benchmark.db')
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True,
+                                       serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = old_test_name
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def timed(func, *args, **kwargs):
+    """
+    timed(func, *args, **kwargs) -> (seconds, result)
+
+    It calls func and returns the elapsed time with its result
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def get_day_files(path=DAYS_PATH):
+    """
+    get_day_files(path=DAYS_PATH) -> list of paths
+
+    It returns the MCCnn.txt files of folder path sorted by day
+    """
+    return sorted(glob.glob(os.path.join(path, 'MCC*.txt')),
+                  key=get_day_from_path)
+
+
+def import_season(importer, paths):
+    """
+    import_season(importer, paths) -> seconds
+
+    It imports the players of the first file and the evaluations of all
+    the files, returning the elapsed time
+    """
+    elapsed, result = timed(importer.import_players, paths[0])
+    for path in paths:
+        seconds, result = timed(importer.import_evaluations, path,
+                                get_day_from_path(path))
+        elapsed += seconds
+    return elapsed
+
+
+def bench_progress(paths, stream=sys.stderr):
+    """
+    bench_progress(paths, stream=sys.stderr) -> list of (case, seconds)
+
+    It compares the import time without progress, reporting the progress
+    on stream for every record and with the default throttling
+    """
+    cases = [('no progress', Progress()),
+             ('progress per record', ConsoleProgress(stream, interval=0,
+                                                     step=0)),
+             ('throttled progress', ConsoleProgress(stream))]
+    results = []
+    for case, progress in cases:
+        best = None
+        for repeat in range(REPEAT):
+            with scratch_database():
+                importer = Importer(Model(), progress=progress)
+                seconds = import_season(importer, paths)
+            best = seconds if best is None else min(best, seconds)
+        results.append((case, best))
+    return results
+
+
+def bench_pragmas(paths):
+    """
+    bench_pragmas(paths) -> list of (case, seconds)
+
+    It compares the import, re-import and statistics recompute times
+    with every SQLITE_PROFILES profile
+    """
+    results = []
+    for profile in sorted(getattr(settings, 'SQLITE_PROFILES', {})):
+        with override_settings(SQLITE_PROFILE=profile), scratch_database():
+            model = Model()
+            importer = Importer(model)
+            results.append(('%s: import' % profile,
+                            import_season(importer, paths)))
+            results.append(('%s: re-import' % profile,
+                            import_season(importer, paths)))
+            seconds, stats = timed(model.rebuild_players_stats)
+            results.append(('%s: recompute' % profile, seconds))
+    return results
+
+
+BATCH_SIZES = (50, 100, 500, 2000, 0)
+
+
+def import_players(paths):
+    """
+    import_players(paths)
+
+    It imports the players of all the files
+    """
+    importer = Importer(Model())
+    for path in paths:
+        importer.import_players(path)
+
+
+def backfill(model, paths):
+    """
+    backfill(model, paths) -> seconds
+
+    It writes the evaluations of all the files through the bulk list of
+    model, as a large backfill does, returning the elapsed time
+    """
+    start = time.perf_counter()
+    players_map = model.get_players_map()
+    for path in paths:
+        day = get_day_from_path(path)
+        for record in iter_file(path):
+            model.add_new_ev_to_bulk(players_map[record.code], record.fv,
+                                     record.v, record.cost, day)
+    model.import_all_evaluations()
+    model.clear_bulk_evaluations()
+    return time.perf_counter() - start
+
+
+def bench_batch(paths):
+    """
+    bench_batch(paths) -> list of (case, seconds)
+
+    It compares the backfill time of all the evaluations with every
+    batch size in BATCH_SIZES (0 is a single bulk_create call) and the
+    time of a second backfill ignoring or updating the stored rows
+    """
+    results = []
+    for batch_size in BATCH_SIZES:
+        best = None
+        for repeat in range(REPEAT):
+            with scratch_database():
+                import_players(paths)
+                seconds = backfill(Model(batch_size=batch_size), paths)
+            best = seconds if best is None else min(best, seconds)
+        results.append(('batch size %s' % (batch_size or 'unbounded'),
+                        best))
+    for conflicts in (IGNORE, UPDATE):
+        with scratch_database():
+            import_players(paths)
+            backfill(Model(), paths)
+            results.append(('backfill again, %s conflicts' % conflicts,
+                            backfill(Model(conflicts=conflicts), paths)))
+    return results
+
+
+SEASON_DAYS = 38
+TEAMS = ('ATA', 'BEN', 'BOL', 'CAG', 'CHI', 'CRO', 'FIO', 'GEN', 'INT', 'JUV',
+         'LAZ', 'MIL', 'NAP', 'ROM', 'SAM', 'SAS', 'SPA', 'TOR', 'UDI', 'VER')
+# first and last code and share of the players of every role
+ROLE_CODES = ((101, 199, 0.1), (201, 499, 0.35), (501, 799, 0.35),
+              (801, None, 0.2))
+
+
+def get_synthetic_codes(players):
+    """
+    get_synthetic_codes(players) -> list of int
+
+    It returns players codes split among the roles as in a real season;
+    the codes exceeding the range of a role go to the forwards
+    """
+    codes = []
+    for first, last, share in ROLE_CODES:
+        if last is None:
+            count = players - len(codes)
+        else:
+            count = min(int(round(players * share)), last - first + 1)
+        codes.extend(range(first, first + count))
+    return codes
+
+
+def make_season(path, players=600, seasons=1, seed=0):
+    """
+    make_season(path, players=600, seasons=1, seed=0) -> list of paths
+
+    It writes to folder path the MCCnn.txt files of seasons synthetic
+    seasons of SEASON_DAYS days with players players, the days of the
+    following seasons are numbered after the previous ones
+    """
+    rng = random.Random(seed)
+    codes = get_synthetic_codes(players)
+    costs = {code: rng.randint(1, 40) for code in codes}
+    teams = {code: rng.choice(TEAMS) for code in codes}
+    paths = []
+    for day in range(1, SEASON_DAYS * seasons + 1):
+        lines = []
+        for code in codes:
+            if rng.random() < 0.05:
+                costs[code] = max(1, costs[code] + rng.choice((-1, 1)))
+            if rng.random() < 0.6:
+                vote = rng.randint(8, 16) / 2.0
+                fanta_vote = vote + rng.choice((0, 0, 0, -0.5, -1, 1, 3))
+            else:
+                vote = fanta_vote = 0.0
+            lines.append('%s|PLAYER %s|%s|%s|%s|%s\n'
+                         % (code, code, teams[code], fanta_vote, vote,
+                            costs[code]))
+        day_path = os.path.join(path, 'MCC%s.txt' % day)
+        with open(day_path, 'w') as f:
+            f.writelines(lines)
+        paths.append(day_path)
+    return paths
+
+
+class HeadlessView:
+    """
+    Stand-in for the Core frame: it lets the controller run without wx,
+    jobs run on the calling thread
+    """
+    def set_status_text(self, value):
+        pass
+
+    def show_message(self, string):
+        pass
+
+    def set_range(self, value):
+        pass
+
+    def set_progress(self, value):
+        pass
+
+    def set_busy(self, busy=True, cancellable=False):
+        pass
+
+    @staticmethod
+    def call_after(func, *args):
+        func(*args)
+
+    @staticmethod
+    def run_job(job, on_done):
+        result = error = None
+        try:
+            result = job()
+        except Exception as e:
+            error = e
+        on_done(result, error)
+
+
+def measured(func, *args, **kwargs):
+    """
+    measured(func, *args, **kwargs) -> (seconds, queries, result)
+
+    It calls func and returns the elapsed time and the number of
+    queries executed with its result
+    """
+    with CaptureQueriesContext(connection) as context:
+        seconds, result = timed(func, *args, **kwargs)
+    return seconds, len(context.captured_queries), result
+
+
+def best_of(func, *args, **kwargs):
+    """
+    best_of(func, *args, **kwargs) -> (seconds, queries)
+
+    It returns the best time of REPEAT calls of func and the queries of
+    the last call
+    """
+    best = None
+    for repeat in range(REPEAT):
+        seconds, queries, result = measured(func, *args, **kwargs)
+        best = seconds if best is None else min(best, seconds)
+    return best, queries
+
+
+def bench_operations(paths):
+    """
+    bench_operations(paths) -> list of (case, seconds, queries)
+
+    It times the import of all the files and the controller paths
+    shown by the frame (avg values, sorted lists, html report) without
+    the graphic interface, counting their queries
+    """
+    tmp_dir = tempfile.mkdtemp()
+    cache_path = os.path.join(tmp_dir, 'benchmark.stats.json')
+    results = []
+    try:
+        with override_settings(STATS_CACHE=cache_path), scratch_database():
+            controller = Controller(view=HeadlessView())
+            importer = Importer(controller.model)
+            seconds, queries, result = measured(importer.import_players,
+                                                paths[0])
+            results.append(('import_players', seconds, queries))
+            seconds = queries = 0
+            for path in paths:
+                day = get_day_from_path(path)
+                elapsed, count, result = measured(
+                    importer.import_evaluations, path, day)
+                seconds += elapsed
+                queries += count
+            results.append(('import_evaluations (%s days)' % len(paths),
+                            seconds, queries))
+
+            def players_avg(cached):
+                if not cached and os.path.exists(cache_path):
+                    os.remove(cache_path)
+                controller.get_players_avg()
+            results.append(('get_players_avg',)
+                           + best_of(players_avg, False))
+            results.append(('get_players_avg (cached)',)
+                           + best_of(players_avg, True))
+
+            roles = (None, 'goalkeeper', 'defender', 'midfielder', 'forward')
+
+            def sorted_players(cached):
+                if not cached:
+                    controller.clear_rows_cache()
+                for role in roles:
+                    for column in range(11):
+                        controller.get_sorted_players(column, role)
+            results.append(('get_sorted_players',)
+                           + best_of(sorted_players, False))
+            results.append(('get_sorted_players (cached)',)
+                           + best_of(sorted_players, True))
+
+            last_day = get_day_from_path(paths[-1])
+
+            def sorted_evaluations(cached):
+                if not cached:
+                    controller.clear_rows_cache()
+                for day in (1, last_day):
+                    for role in roles[1:]:
+                        for column in range(7):
+                            controller.get_sorted_evaluations(column, role,
+                                                              day)
+            results.append(('get_sorted_evaluations',)
+                           + best_of(sorted_evaluations, False))
+            results.append(('get_sorted_evaluations (cached)',)
+                           + best_of(sorted_evaluations, True))
+            results.append(('build_report',) + best_of(
+                controller.build_report,
+                os.path.join(tmp_dir, 'players_stat.html')))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+SUITES = {
+    'batch': bench_batch,
+    'operations': bench_operations,
+    'pragmas': bench_pragmas,
+    'progress': bench_progress,
+}
@@ -0,0 +1,73 @@
+"""
+On-disk cache of the players avg values.
+
+The cache is a JSON file holding the fingerprint of the data it was
+computed from (see Model.get_data_fingerprint): at startup it is read
+once and used only if the fingerprint of the database is the same,
+otherwise the values are computed again and the file is replaced.
+"""
+import json
+import logging
+import os
+from django.conf import settings
+from players.stats import PlayerAvg
+
+CACHE_FORMAT = 3  # bump when PlayerAvg or its computation changes
+
+logger = logging.getLogger(__name__)
+
+
+def get_cache_path():
+    """
+    get_cache_path() -> path
+
+    It returns settings.STATS_CACHE, by default a file next to the
+    database
+    """
+    path = getattr(settings, 'STATS_CACHE', None)
+    if path is None:
+        database = settings.DATABASES['default']['NAME']
+        path = '%s.stats.json' % os.path.splitext(str(database))[0]
+    return path
+
+
+def load_players_avg(fingerprint, path=None):
+    """
+    load_players_avg(fingerprint, path=None) -> dictionary or None
+
+    It returns the cached players avg values (player.code: PlayerAvg
+    object) if they were computed from data with the same fingerprint,
+    None if the cache is missing, invalid or stale
+    """
+    path = path or get_cache_path()
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or \
+            data.get('format') != CACHE_FORMAT or \
+            data.get('fingerprint') != fingerprint:
+        return None
+    return {values[0]: PlayerAvg.from_values(values[1:])
+            for values in data['players']}
+
+
+def save_players_avg(d_avg, fingerprint, path=None):
+    """
+    save_players_avg(d_avg, fingerprint, path=None)
+
+    It writes the players avg values computed from data with fingerprint,
+    replacing the cache file only when it is completely written
+    """
+    path = path or get_cache_path()
+    data = {'format': CACHE_FORMAT, 'fingerprint': fingerprint,
+            'players': [(code,) + avg.get_values()
+                        for code, avg in d_avg.items()]}
+    tmp_path = '%s.tmp' % path
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except (IOError, OSError) as e:
+        logger.warning("stats cache not saved: %s", e)
@@ -1,25 +1,86 @@
-import os
-import re
+import logging
+import time
+from players.cache import load_players_avg, save_players_avg
+from players.export import export_data
+from players.importer import Importer, get_day_from_path, get_role
 from players.model import Model
-from players.views.core import Core
+from players.parser import ParseError
+from players.progress import Cancelled, ViewProgress
+from players.report import REPORT_NAME, write_report
+from players.sorting import SortedRows
+from players.stats import format_cost
+from players.startup import StartupTimer
+from django.db import transaction
 from django.db.utils import OperationalError
 
+logger = logging.getLogger(__name__)
+
 
 class Controller:
-    def __init__(self):
+    def __init__(self, timer=None, view=None):
+        """
+        Controller(timer=None, view=None)
+
+        It shows the Core frame and loads the data in background. If a
+        view is passed (i.e. players.benchmark.HeadlessView) it is used
+        instead of the frame, wx is not imported and no data is loaded.
+        """
+        self.timer = timer or StartupTimer()
         self.model = Model()
-        self.view = Core(parent=None, controller=self, title='Players')
+        self.view = view
+        if view is None:
+            from players.views.core import Core
+            self.view = Core(parent=None, controller=self, title='Players')
+            self.timer.mark('window shown')
+        self.progress = ViewProgress(self.view)  # replaced by every job
         self.d_evaluations = {}
         self.d_avg = {}
-        self.init_view()
-        self.html = None
+        self.rows_cache = {}
+        if view is None:
+            self.load_data()
+
+    def load_data(self):
+        """
+        load_data()
+
+        It computes the players avg values on a worker thread, so the
+        frame is shown and responsive while the data is loading, then
+        it initializes the frame widgets (see init_view)
+        """
+        self.view.set_status_text("loading data...")
+        self.start_job(self.read_data, self.on_data_loaded)
+
+    def read_data(self):
+        """
+        read_data() -> dictionary
 
-    def init_view(self):
+        It returns the players avg values (see compute_players_avg), an
+        empty dictionary if no day has been imported yet. A database
+        error is shown by end_job.
         """
-        init_view()
+        if self.model.get_days():
+            return self.compute_players_avg()
+        return {}
+
+    def on_data_loaded(self, d_avg):
+        """
+        on_data_loaded(d_avg)
+
+        It shows the players avg values loaded by read_data
+        """
+        self.d_avg = d_avg
+        self.clear_rows_cache()
+        self.init_view(load_avg=False)
+        self.timer.mark('data loaded')
+        self.timer.report()
+
+    def init_view(self, load_avg=True):
+        """
+        init_view(load_avg=True)
 
         It initializes the frame widgets activating or deactivating
-        radio boxes and menus
+        radio boxes and menus. If load_avg is False the players avg values
+        already computed are shown.
         """
         try:
             players = self.get_players()
@@ -29,8 +90,9 @@ class Controller:
                 days = self.model.get_days()
                 if days:
                     self.get_evaluations(day=days[0], role='goalkeeper')
-                    self.get_players_avg()
-                    self.view.fill_players(players)
+                    if load_avg:
+                        self.get_players_avg()
+                    self.view.fill_players(self.get_players_rows())
                     self.view.set_status_text("Found %s players on db" %
                                               len(players))
                 else:
@@ -44,8 +106,7 @@ class Controller:
                 self.view.m_ev_import.Enable(False)
         except OperationalError:
             self.view.show_message("Database not found. Please use \n"
-                                   "'python manage.py makemigrations players'\n"
-                                   "and 'python manage.py migrate' commands")
+                                   "'python manage.py migrate' command")
 
     def enable_widgets(self, enable=True):
         """
@@ -117,43 +178,99 @@ class Controller:
 
         it creates a new player object
         """
-        self.model.new_player(code, name, real_team, role, cost)
+        if self.get_player_by_code(int(code)):
+            self.view.show_message("Player with code %s already exists"
+                                   % code)
+        else:
+            self.model.new_player(code, name, real_team, role, cost)
+            self.clear_rows_cache()
 
     def import_players(self, path):
         """
         import_players(path)
 
-        it imports players on database from txt file
-        """
-        self.model.clear_bulk_players()
-        with open(path) as f:
-            data = [line.strip() for line in f.readlines()]
-        self.view.set_status_text("importing players")
-        print("INFO: importing players...")
-        count = 1
-        players_dict = self.model.get_players_data()
-        self.view.set_range(len(data))
-        # string sample: 100|NAME|ROM|6.5|6.5|19
-        for s in data:
-            code, name, real_team, fv, v, cost = s.strip().split('|')
-            role = self.get_role(code)
-            if code not in players_dict.keys():
-                self.import_player_bulk(code, name, real_team, role, cost)
-            else:
-                player_data = players_dict.get(int(code))
-                if name != player_data[0] or real_team != player_data[1]:
-                    self.update_player(code, name, real_team, role, cost)
-            self.view.set_status_text("importing data %s/%s"
-                                      % (count, len(data)))
-            self.view.set_progress(count)
-            self.view.Update()
-            count += 1
-        self.commit_all_players()
-        print("INFO: Success!")
-        self.view.show_message('Players successfully imported!')
-        self.view.set_progress(0)  # clear gauge
+        it imports players on database from txt file on a worker thread
+        """
+        logger.info("importing players from %s...", path)
+        progress = self.new_progress()
+        importer = Importer(self.model, progress=progress)
+        self.start_job(lambda: importer.import_players(path),
+                       self.on_players_imported, progress=progress)
+
+    def on_players_imported(self, result):
+        """
+        on_players_imported(result)
+
+        It shows the result of the players import
+        """
+        new, updated, unchanged = result
+        self.clear_rows_cache()
+        self.view.show_message('Players successfully imported!\n'
+                               'new: %s, updated: %s, unchanged: %s'
+                               % (new, updated, unchanged))
+        self.view.m_players_import.Enable(False)
         self.show_data()
 
+    def new_progress(self):
+        """
+        new_progress() -> ViewProgress object
+
+        It returns a new progress reporter for a job running on a worker
+        thread, stored to be cancelled later
+        """
+        self.progress = ViewProgress(self.view,
+                                     call_after=self.view.call_after)
+        return self.progress
+
+    def start_job(self, job, on_done, progress=None):
+        """
+        start_job(job, on_done, progress=None)
+
+        It runs job() on a worker thread, keeping the frame responsive, and
+        calls on_done(result) on the main thread when the job succeeds.
+        progress is the reporter (see new_progress) checked by job: only
+        a job with a progress can be cancelled.
+        """
+        def run():
+            try:
+                return job()
+            finally:
+                self.model.close_connection()
+        self.view.set_busy(True, cancellable=progress is not None)
+        self.view.run_job(run, lambda result, error: self.end_job(
+            on_done, result, error))
+
+    def end_job(self, on_done, result, error):
+        """
+        end_job(on_done, result, error)
+
+        Called on the main thread when a job ends. If the job failed
+        or it has been cancelled, its transaction has been rolled back.
+        """
+        self.view.set_busy(False)
+        self.progress.clear()
+        if isinstance(error, Cancelled):
+            self.view.set_status_text('Operation cancelled')
+            self.view.show_message('Operation cancelled, no data changed!')
+        elif isinstance(error, ParseError):
+            self.view.show_message(str(error))
+        elif isinstance(error, OperationalError):
+            self.view.show_message("Database error: %s\nPlease use "
+                                   "'python manage.py migrate' command"
+                                   % error)
+        elif error:
+            self.view.show_message('Operation failed: %s' % error)
+        else:
+            on_done(result)
+
+    def cancel_job(self):
+        """
+        cancel_job()
+
+        It stops the running job, rolling back its transaction
+        """
+        self.progress.cancel()
+
     def show_data(self):
         """
         show_data()
@@ -166,55 +283,49 @@ class Controller:
             self.view.set_status_text('No evaluations in database')
             self.view.m_ev_import.Enable(True)
         else:
-            players = self.get_players()
-            self.view.fill_players(players)
+            self.view.fill_players(self.get_players_rows())
 
     def import_evaluations(self, path):
         """
         import_evaluations(path)
 
-        it imports evaluations on database from txt file
+        it imports evaluations on database from txt file and computes the
+        players avg values on a worker thread
         """
-        self.model.clear_bulk_evaluations()
         players = self.get_players()
         if not players:
             self.view.show_message('No players found, import them before')
         else:
             day = self.get_day_from_path(path)
             if day:
-                with open(path) as f:
-                    data = [line.strip() for line in f.readlines()]
-                print("INFO: importing evaluations...")
-                self.view.set_range(len(data))
-                count = 1
-                # string sample: 100|NAME|ROM|6.5|6.5|19
-                day_evs = self.get_evaluations(day=day, role='goalkeeper')
-                if day_evs:
-                    self.delete_day_evaluations(day)
-                    print("INFO: Deleting all evaluations of day %s..." % day)
-
-                for s in data:
-                    code, name, real_team, fv, v, cost = s.strip().split('|')
-                    code = code.replace("\xef\xbb\xbf", "")
-                    cost = cost.replace("\xc2\xa0", "")  # avoid Non-break sp.
-                    player = self.get_player_by_code(int(code))
-                    if not player:
-                        role = self.get_role(code)
-                        self.new_player(code, name, real_team, role, cost)
-                        print("INFO: new player %s stored!" % code)
-
-                    self.import_ev_bulk(code, fv, v, cost, day)
-                    self.view.set_status_text("importing data %s/%s"
-                                              % (count, len(data)))
-                    self.view.set_progress(count)
-                    self.view.Update()
-                    count += 1
-                self.commit_all_evaluations()
-                self.get_players_avg()
-                print("INFO: Success!")
-                self.view.show_message('Evaluations successfully imported!')
-                self.view.set_progress(0)  # clear gauge
-                self.init_view()
+                logger.info("importing evaluations from %s...", path)
+                progress = self.new_progress()
+                importer = Importer(self.model, progress=progress)
+
+                def job():
+                    # a cancel between the import and the avg values
+                    # rolls back the import too
+                    with transaction.atomic():
+                        result = importer.import_evaluations(path, day)
+                        progress.check()
+                    return result, self.compute_players_avg()
+                self.start_job(job, self.on_evaluations_imported,
+                               progress=progress)
+
+    def on_evaluations_imported(self, result):
+        """
+        on_evaluations_imported(result)
+
+        It shows the import result and the players avg values computed
+        after the import
+        """
+        (rows, new_players, created, updated, deleted), self.d_avg = result
+        self.clear_rows_cache()
+        self.view.show_message('Evaluations successfully imported!\n'
+                               'created: %s, updated: %s, deleted: %s\n'
+                               'new players: %s'
+                               % (created, updated, deleted, new_players))
+        self.init_view(load_avg=False)
 
     def get_player_by_code(self, code):
         """
@@ -230,6 +341,7 @@ class Controller:
 
         It deletes player with code=code
         """
+        self.clear_rows_cache()
         return self.model.delete_player(code)
 
     def delete_all_data(self):
@@ -240,6 +352,7 @@ class Controller:
         """
         self.model.delete_all_players()
         self.model.delete_all_evaluations()
+        self.clear_rows_cache()
 
     def delete_evaluation(self, code, day):
         """
@@ -248,6 +361,7 @@ class Controller:
         It deletes the evaluation of day=day and player.code=code
         """
         self.model.delete_evaluation(code, day)
+        self.clear_rows_cache()
 
     def delete_day_evaluations(self, day):
         """
@@ -256,7 +370,8 @@ class Controller:
         It deletes all the evaluations stored in database with day=day
         """
         self.model.delete_day_evaluations(day)
-        print("INFO: all evaluations with day %s deleted!" % day)
+        self.clear_rows_cache()
+        logger.info("all evaluations with day %s deleted", day)
 
     def commit_all_players(self):
         """
@@ -266,6 +381,7 @@ class Controller:
         with only a commit operation
         """
         self.model.import_all_players()
+        self.clear_rows_cache()
 
     def commit_all_evaluations(self):
         """
@@ -275,6 +391,7 @@ class Controller:
         with only a commit operation
         """
         self.model.import_all_evaluations()
+        self.clear_rows_cache()
 
     def import_player_bulk(self, code, name, real_team, role, cost):
         """
@@ -284,50 +401,123 @@ class Controller:
         """
         self.model.add_new_player_to_bulk(code, name, real_team, role, cost)
 
-    def import_ev_bulk(self, code, fv, v, cost, day):
+    def import_ev_bulk(self, player, fv, v, cost, day):
         """
-        import_ev_bulk(code, fv, v, cost, day)
+        import_ev_bulk(player, fv, v, cost, day)
 
         It adds a new Evaluation object to bulk_evaluations_to_create list
         """
-        self.model.add_new_ev_to_bulk(code, fv, v, cost, day)
+        self.model.add_new_ev_to_bulk(player, fv, v, cost, day)
+
+    def clear_rows_cache(self):
+        """
+        clear_rows_cache()
+
+        It discards the rows shown by the list controls, they are built
+        again from database at the next request
+        """
+        self.rows_cache = {}
+
+    def get_cached_rows(self, key, build):
+        """
+        get_cached_rows(key, build) -> SortedRows object
+
+        It returns the rows cached with key, calling build() only if
+        they are not in cache
+        """
+        rows = self.rows_cache.get(key)
+        if rows is None:
+            rows = self.rows_cache[key] = build()
+        return rows
+
+    def get_players_rows(self, role=None):
+        """
+        get_players_rows(role=None) -> SortedRows object
+
+        It returns the rows of the main list control for the players with
+        role=role (all the players if role is None) with format:
+        (code, name, real_team, fv_avg, v_avg, rate, last_cost,
+        recent_avg, form, trend, std, delta_cost). The 'cost' column shows
+        last_cost and delta_cost formatted (see players.stats.format_cost).
+        Players without avg values are not included.
+        """
+        def build():
+            players = self.get_players_by_role(role) if role else \
+                self.get_players()
+            rows = []
+            for player in players:
+                avg = self.d_avg.get(player.code)
+                if avg:
+                    rows.append((player.code, player.name, player.real_team,
+                                 avg.fv_avg, avg.v_avg, avg.rate,
+                                 avg.last_cost, avg.recent_avg, avg.form,
+                                 avg.trend, avg.std, avg.delta_cost))
+            formats = {6: lambda row: format_cost(row[6], row[11]),
+                       7: lambda row: '%.2f' % row[7],
+                       8: lambda row: '%.2f' % row[8],
+                       9: lambda row: '%+.3f' % row[9],
+                       10: lambda row: '%.2f' % row[10]}
+            return SortedRows(rows, descending=(3, 4, 5, 6, 7, 8, 9, 10),
+                              formats=formats)
+        return self.get_cached_rows(('players', role), build)
+
+    def get_players_summary_rows(self, role):
+        """
+        get_players_summary_rows(role) -> SortedRows object
+
+        It returns the rows of the players summary for the players with
+        role=role with format: (code, name, real_team, role, cost)
+        """
+        def build():
+            return SortedRows(
+                [(player.code, player.name, player.real_team, player.role,
+                  player.cost) for player in self.get_players_by_role(role)],
+                descending=(4,))
+        return self.get_cached_rows(('summary', role), build)
 
-    def get_sorted_players(self, id_c, role):
+    def get_evaluations_rows(self, role, day):
         """
-        get_sorted_players(id_c, role) -> list of Players
+        get_evaluations_rows(role, day) -> SortedRows object
 
-        It returns a list of Player objects filtered by role and
-        sorted by id_column id_c
+        It returns the rows of the evaluations summary for the evaluations
+        with day=day and player role=role with format:
+        (code, name, real_team, fanta_vote, vote, cost, day)
         """
-        if id_c > 2:
-            return self.get_players_ordered_by_avg(id_c, role)
-        columns = {0: 'code', 1: 'name', 2: 'real_team'}
-        return self.model.get_players_ordered_by_filter(columns.get(id_c), role)
+        def build():
+            return SortedRows(
+                [(ev.player.code, ev.player.name, ev.player.real_team,
+                  ev.fanta_vote, ev.vote, ev.cost, ev.day)
+                 for ev in self.get_evaluations(role=role, day=day)],
+                descending=(3, 4, 5))
+        return self.get_cached_rows(('evaluations', role, int(day)), build)
+
+    def get_sorted_players(self, id_c, role, reverse=None):
+        """
+        get_sorted_players(id_c, role, reverse=None) -> list of tuples
+
+        It returns the rows of the players with role=role (see
+        get_players_rows) sorted in memory by column id_c.
+        If reverse is None the avg columns are sorted in descending order.
+        """
+        return self.get_players_rows(role).get_sorted(id_c, reverse)
 
     def get_sorted_players_by_cost(self, role):
         """
-        get_sorted_players_by_cost(role) -> list of Players
+        get_sorted_players_by_cost(role) -> list of tuples
 
-        It returns a list of Player objects sorted by 'cost'
+        It returns the rows of the players summary (see
+        get_players_summary_rows) sorted by descending 'cost'
         """
-        return self.model.get_players_ordered_by_filter('-cost', role)
+        return self.get_players_summary_rows(role).get_sorted(4)
 
     def get_players_ordered_by_avg(self, id_c, role):
         """
-        get_players_ordered_by_avg(id_c, role) -> list of Players
+        get_players_ordered_by_avg(id_c, role) -> list of tuples
 
-        It returns a list of Player objects filtered by 'role' and sorted by
-        descendant field value
+        It returns the rows of the players with role=role (see
+        get_players_rows) sorted by descendant avg column id_c
         """
-        columns = {3: 0, 4: 1, 5: 2}
-        players = self.get_players_by_role(role)
-        if id_c == 6:
-            return sorted(players,
-                          key=lambda x: int(self.d_avg.get(
-                              x.code)[-1].split(' ')[0]), reverse=True)
-        return sorted(players,
-                      key=lambda x: self.d_avg.get(x.code)[columns.get(id_c)],
-                      reverse=True)
+        return self.get_players_rows(role).get_sorted(id_c, reverse=True)
 
     def update_player(self, code, name, real_team, role, cost):
         """
@@ -336,6 +526,7 @@ class Controller:
         It updates Player values and return Player object
         """
         self.model.update_player(code, name, real_team, role, cost)
+        self.clear_rows_cache()
 
     def update_evaluation(self, code, fv, v, cost, day):
         """
@@ -344,6 +535,7 @@ class Controller:
         It updates Evaluation values and return Evaluation object
         """
         self.model.update_evaluation(code, fv, v, cost, day)
+        self.clear_rows_cache()
 
     def new_evaluation(self, code, fv, v, cost, day):
         """
@@ -354,8 +546,12 @@ class Controller:
         if not self.get_player_by_code(int(code)):
             self.view.show_message("You must create player with code %s before"
                                    % code)
+        elif self.get_evaluation(code, day):
+            self.view.show_message("Evaluation of day %s for code %s already "
+                                   "exists" % (day, code))
         else:
             self.model.new_evaluation(code, fv, v, cost, day)
+            self.clear_rows_cache()
 
     def get_evaluation(self, code, day):
         """
@@ -380,16 +576,7 @@ class Controller:
 
         It returns the string of role by player code passed as argument
         """
-        if int(code) < 200:
-            return "goalkeeper"
-        elif 200 <= int(code) < 500:
-            return "defender"
-        elif 500 <= int(code) < 800:
-            return "midfielder"
-        elif int(code) >= 800:
-            return "forward"
-        else:
-            raise AttributeError('Not a Int input')
+        return get_role(code)
 
     def get_evaluations(self, role, day):
         """
@@ -400,63 +587,54 @@ class Controller:
         """
         return self.model.get_evaluations(role=role, day=day)
 
-    def get_sorted_evaluations(self, id_c, role, day):
+    def get_sorted_evaluations(self, id_c, role, day, reverse=None):
         """
-        get_sorted_evaluations(id_c, role, day) -> list of Evaluations
+        get_sorted_evaluations(id_c, role, day, reverse=None)
+            -> list of tuples
 
-        It returns a list of Evaluation objects filtered by role, day and
-        sorted by id_column id_c
+        It returns the rows of the evaluations with role=role and day=day
+        (see get_evaluations_rows) sorted in memory by column id_c.
+        If reverse is None the values columns are sorted in descending
+        order.
         """
-        columns = {0: 'player__code', 1: 'player__name', 2: 'player__real_team',
-                   3: '-fanta_vote', 4: '-vote', 5: '-cost'}
-        return self.model.get_evaluations_ordered_by_filter(columns.get(id_c),
-                                                            role, int(day))
+        return self.get_evaluations_rows(role, day).get_sorted(id_c, reverse)
 
     def get_players_avg(self):
         """
         get_players_avg() -> dictionary
 
-        It returns a dictionary with format player.code: (*avg_values)
-        *avg_values are:
-        fv_avg: avg of player.fanta_vote
-        v_avg: avg of player.vote
-        rate: rate evaluated match / played match
-        cost_indicator: the difference between the actual player cost
-                        ed the initial one
-        """
-        days = self.model.get_days()
-        played = len(days)
-        print("INFO: days played -> %s" % played)
-        last_day = self.model.get_last_imported_day()
-        players = self.model.get_players()
-        count = 1
-        self.view.set_range(len(players))
-        for player in players:
-            # fv_avg = self.model.get_avg(player=player, field='fanta_vote')
-            # v_avg = self.model.get_avg(player=player, field='vote')
-            fv_avg = self.model.get_v_avg(player=player, fanta=True)
-            v_avg = self.model.get_v_avg(player=player, fanta=False)
-            evaluated = self.model.get_evaluated(player)
-            rate = 100 * evaluated / float(played)
-            ev = self.model.get_evaluation(code=player.code, day=last_day)
-            if ev:
-                last_cost = ev.cost
-                delta_cost = last_cost - player.cost
-                s_cost = '(%s)' % delta_cost
-                if delta_cost > 0:
-                    s_cost = '(+%s)' % delta_cost
-                cost_indicator = '%s %s' % (last_cost, s_cost)
-            else:
-                cost_indicator = '%s (-)' % player.cost
-            self.d_avg[player.code] = (fv_avg, v_avg, rate, cost_indicator)
-            self.view.set_progress(count)
-            count += 1
-            self.view.set_status_text("calculating data %s/%s"
-                                      % (count, len(players)))
-            self.view.Update()
-        self.view.set_progress(0)  # clear gauge
+        It returns a dictionary with format player.code: PlayerAvg object
+        (see players.stats.PlayerAvg)
+        """
+        self.view.set_status_text("calculating data...")
+        self.d_avg = self.compute_players_avg()
+        self.clear_rows_cache()
+        self.view.set_status_text("Found %s players on db" % len(self.d_avg))
         return self.d_avg
 
+    def compute_players_avg(self):
+        """
+        compute_players_avg() -> dictionary
+
+        It returns the players avg values (see get_players_avg) without
+        touching the view, so it can run on a worker thread.
+        The values are read from the on-disk cache (see players.cache) if
+        the data has not changed, otherwise they are read from the stored
+        players statistics (see Model.get_players_stats) and cached.
+        """
+        start = time.perf_counter()
+        fingerprint = self.model.get_data_fingerprint()
+        d_avg = load_players_avg(fingerprint)
+        if d_avg is not None:
+            logger.info("players avg values read from cache in %.3fs",
+                        time.perf_counter() - start)
+            return d_avg
+        d_avg = self.model.get_players_stats()
+        save_players_avg(d_avg, fingerprint)
+        logger.info("players avg values computed: %s players in %.3fs",
+                    len(d_avg), time.perf_counter() - start)
+        return d_avg
+
     def get_avg_dict(self):
         """
         get_avg_dict() -> dictionary
@@ -474,62 +652,45 @@ class Controller:
         Filename must be in format 'MCCnn.txt'.
         """
         try:
-            day = re.findall(r'\d+', os.path.normpath(path))[-1]
-            return int(day)
+            return get_day_from_path(path)
         except IndexError:
             self.view.show_message("Invalid filename! "
                                    "Name must contain at least a number")
 
-    def generate_html(self, iterable):
-        table_header = '''
-        <table bgcolor="#FFFFF" border="2">
-          <tr bgcolor="66CCCC" >
-            <td align=center><B>codice</B></td>
-            <td align=center width=120><B>Giocatore</B></td>
-            <td align=center width=40><B>squadra</B></td>
-            <td align=center width=60><B>media FV</B></td>
-            <td align=center width=60><B>media V</B></td>
-            <td align=center width=60><B>affidabilita'</B></td>
-            <td align=center width=60><B>valutazione</B></td>
-          </tr>
-        '''
-        self.html.write(table_header)
-        filtered = [(k, self.d_avg.get(k)) for k in iterable]
-        # metto in ordine, prima per presenze, poi per fanta media
-        sorted_players = sorted(filtered, key=lambda x: (x[1][2], x[1][0]), 
-                                reverse=True)
-        for record in sorted_players:
-            key, data = record
-            player = self.get_player_by_code(int(key))
-            fv_avg, v_avg, rate, cost = data
-            row = '''
-            <tr>
-              <td align=center>%s</td>
-              <td width=120>%s</td>
-              <td align=center>%s</td>
-              <td width=60 align=center>%s</td>
-              <td width=60 align=center>%s</td>
-              <td width=60 align=center>%s</td>
-              <td width=60 align=center>%s</td>
-            </tr>''' % (key, player.name, player.real_team, 
-                        round(float(fv_avg), 3), round(float(v_avg), 3), 
-                        round(float(rate), 3), cost)
-            self.html.write(row)
-        self.html.write('</table>')
-
-    def build_report(self):
-        players_dict = self.get_avg_dict()
-        gk = [key for key in players_dict if key < 200]
-        df = [key for key in players_dict if 200 < key < 500]
-        mf = [key for key in players_dict if 500 < key < 800]
-        fw = [key for key in players_dict if key > 800]
-        html_name = "players_stat.html"
-        self.html = open(html_name, "w")
-        for role, players in [("Portieri", gk), ("Difensori", df), 
-                              ("Centrocampisti", mf), ("Attaccanti", fw)]:
-            print("INFO: generating %s report..." % role)
-            self.html.write("<br><strong>%s</strong><br>" % role)
-            self.generate_html(players)
-            print("INFO: report %s successfully created!" % role)
-        self.html.close()
-        print("INFO: file <%s> successfully created!" % html_name)
+    def export_data(self, data, path, file_format=None):
+        """
+        export_data(data, path, file_format=None)
+
+        It exports data ('players' or 'evaluations') to path on a worker
+        thread (see players.export); the players statistics are the avg
+        values shown by the players list
+        """
+        logger.info("exporting %s to %s...", data, path)
+        d_avg = self.get_avg_dict()
+        self.start_job(lambda: export_data(self.model, data, path,
+                                           file_format, d_avg=d_avg),
+                       lambda count: self.on_data_exported(data, path, count))
+
+    def on_data_exported(self, data, path, count):
+        """
+        on_data_exported(data, path, count)
+
+        It shows the result of the export
+        """
+        logger.info("%s %s exported to %s", count, data, path)
+        self.view.set_status_text("%s %s exported" % (count, data))
+        self.view.show_message('%s %s successfully exported to\n%s'
+                               % (count, data, path))
+
+    def build_report(self, path=REPORT_NAME):
+        """
+        build_report(path=REPORT_NAME)
+
+        It writes the html report of the players avg values to path,
+        joining the players names loaded with a single query
+        (see players.report)
+        """
+        start = time.perf_counter()
+        write_report(self.get_avg_dict(), self.model.get_players_data(), path)
+        logger.info("report <%s> created in %.3fs", path,
+                    time.perf_counter() - start)
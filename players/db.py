@@ -0,0 +1,42 @@
+"""
+SQLite performance profiles, applied to every new database connection.
+
+The profile is chosen by the SQLITE_PROFILE setting among the
+SQLITE_PROFILES ones: every item is a PRAGMA name and its value.
+"""
+from django.conf import settings
+
+DEFAULT_PROFILE = 'default'
+
+
+def get_profile(name=None):
+    """
+    get_profile(name=None) -> dictionary
+
+    It returns the pragmas of the profile name, by default the one
+    chosen by the SQLITE_PROFILE setting
+    """
+    if name is None:
+        name = getattr(settings, 'SQLITE_PROFILE', DEFAULT_PROFILE)
+    return getattr(settings, 'SQLITE_PROFILES', {}).get(name, {})
+
+
+def apply_profile(connection, name=None):
+    """
+    apply_profile(connection, name=None)
+
+    It executes the pragmas of the profile name on a sqlite connection
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in get_profile(name).items():
+            cursor.execute('PRAGMA %s = %s' % (pragma, value))
+
+
+# noinspection PyUnusedLocal
+def on_connection_created(sender, connection, **kwargs):
+    """
+    Receiver of the connection_created signal
+    """
+    apply_profile(connection)
@@ -0,0 +1,237 @@
+"""
+Machine-readable exports of the players statistics and of the raw
+evaluations: CSV, JSON Lines and a columnar NumPy .npz archive (one
+array per column).
+
+The players statistics are the avg values shown by the players list
+(see Model.get_players_stats) joined with the players data; the players
+and the evaluations are streamed from the database chunk_size rows at a
+time and written as they are read, so the memory used does not grow
+with the number of seasons stored. The .npz columns are first spilled
+to temporary files, then copied into the archive once the number of
+rows is known.
+Every export is written to a temporary file which replaces path only
+when it is complete.
+"""
+import csv
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+import numpy as np
+from players.utils import chunks
+
+CHUNK_SIZE = 2000  # rows read from database and converted at a time
+FORMATS = ('csv', 'jsonl', 'npz')
+
+PLAYERS_COLUMNS = (('code', 'i8'), ('name', 'U'), ('real_team', 'U'),
+                   ('role', 'U'), ('cost', 'i8'), ('fv_avg', 'f8'),
+                   ('v_avg', 'f8'), ('rate', 'f8'), ('last_cost', 'i8'),
+                   ('delta_cost', 'f8'), ('recent_avg', 'f8'),
+                   ('form', 'f8'), ('trend', 'f8'), ('std', 'f8'))
+EVALUATIONS_COLUMNS = (('code', 'i8'), ('day', 'i8'), ('fanta_vote', 'f8'),
+                       ('vote', 'f8'), ('cost', 'i8'))
+EXPORTS = {'players': PLAYERS_COLUMNS, 'evaluations': EVALUATIONS_COLUMNS}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def iter_players_rows(model, d_avg, chunk_size=CHUNK_SIZE):
+    """
+    iter_players_rows(model, d_avg, chunk_size=CHUNK_SIZE) -> iterator
+
+    It yields a PLAYERS_COLUMNS row for every player with avg values in
+    d_avg (player.code: PlayerAvg object), joining the players data read
+    by model chunk_size rows at a time
+    """
+    for player in model.iter_players(chunk_size=chunk_size):
+        avg = d_avg.get(player[0])
+        if avg is not None:
+            yield player + avg.get_values()
+
+
+def get_format(path, file_format=None):
+    """
+    get_format(path, file_format=None) -> string
+
+    It returns file_format or the format of the path extension
+    """
+    file_format = file_format or os.path.splitext(path)[1][1:].lower()
+    if file_format not in FORMATS:
+        raise ExportError("Unknown export format '%s', choose from: %s"
+                          % (file_format, ', '.join(FORMATS)))
+    return file_format
+
+
+def write_csv(f, columns, rows, chunk_size=CHUNK_SIZE):
+    """
+    write_csv(f, columns, rows, chunk_size=CHUNK_SIZE) -> int
+
+    It writes the header and the rows to the text file f, returning the
+    number of rows. None values are written as empty fields.
+    """
+    writer = csv.writer(f, lineterminator='\n')
+    writer.writerow([name for name, dtype in columns])
+    count = 0
+    for chunk in chunks(rows, chunk_size):
+        writer.writerows(chunk)
+        count += len(chunk)
+    return count
+
+
+def write_jsonl(f, columns, rows, chunk_size=CHUNK_SIZE):
+    """
+    write_jsonl(f, columns, rows, chunk_size=CHUNK_SIZE) -> int
+
+    It writes every row as a JSON object on its own line to the text
+    file f, returning the number of rows
+    """
+    names = [name for name, dtype in columns]
+    count = 0
+    for chunk in chunks(rows, chunk_size):
+        f.write(''.join('%s\n' % json.dumps(dict(zip(names, row)))
+                        for row in chunk))
+        count += len(chunk)
+    return count
+
+
+class ColumnSpill:
+    def __init__(self, dtype, tmp_dir):
+        """
+        ColumnSpill(dtype, tmp_dir)
+
+        Temporary file of the values of a column: numbers are stored as
+        raw bytes of dtype, strings ('U') one per line, keeping the
+        length of the longest one
+        """
+        self.dtype = dtype
+        self.width = 1
+        self.is_text = dtype == 'U'
+        fd, self.path = tempfile.mkstemp(dir=tmp_dir)
+        if self.is_text:
+            self.f = os.fdopen(fd, 'w+', encoding='utf-8', newline='\n')
+        else:
+            self.f = os.fdopen(fd, 'w+b')
+
+    def append(self, values):
+        """
+        append(values)
+
+        It stores a chunk of values, None is stored as NaN
+        """
+        if self.is_text:
+            self.width = max([self.width] + [len(value) for value in values])
+            self.f.write(''.join('%s\n' % value for value in values))
+        else:
+            values = [np.nan if value is None else value for value in values]
+            self.f.write(np.array(values, dtype=self.dtype).tobytes())
+
+    def get_dtype(self):
+        """
+        get_dtype() -> numpy.dtype
+
+        It returns the dtype of the whole column
+        """
+        if self.is_text:
+            return np.dtype('<U%s' % self.width)
+        return np.dtype(self.dtype)
+
+    def copy_to(self, f, count, chunk_size=CHUNK_SIZE):
+        """
+        copy_to(f, count, chunk_size=CHUNK_SIZE)
+
+        It writes the column to the binary file f as a .npy array of
+        count values
+        """
+        dtype = self.get_dtype()
+        np.lib.format.write_array_header_1_0(
+            f, {'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False, 'shape': (count,)})
+        self.f.seek(0)
+        if self.is_text:
+            for chunk in chunks(self.f, chunk_size):
+                values = [line[:-1] for line in chunk]
+                f.write(np.array(values, dtype=dtype).tobytes())
+        else:
+            shutil.copyfileobj(self.f, f)
+
+    def close(self):
+        """
+        close()
+
+        It removes the temporary file
+        """
+        self.f.close()
+        os.remove(self.path)
+
+
+def write_npz(f, columns, rows, chunk_size=CHUNK_SIZE):
+    """
+    write_npz(f, columns, rows, chunk_size=CHUNK_SIZE) -> int
+
+    It writes the rows to the binary file f as a compressed .npz archive
+    with an array for every column (see numpy.load), returning the
+    number of rows. None values are stored as NaN.
+    """
+    tmp_dir = tempfile.mkdtemp()
+    spills = [ColumnSpill(dtype, tmp_dir) for name, dtype in columns]
+    try:
+        count = 0
+        for chunk in chunks(rows, chunk_size):
+            for spill, values in zip(spills, zip(*chunk)):
+                spill.append(values)
+            count += len(chunk)
+        with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_DEFLATED,
+                             allowZip64=True) as archive:
+            for (name, dtype), spill in zip(columns, spills):
+                with archive.open('%s.npy' % name, 'w',
+                                  force_zip64=True) as npy:
+                    spill.copy_to(npy, count, chunk_size)
+    finally:
+        for spill in spills:
+            spill.close()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return count
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'npz': write_npz}
+
+
+def export_data(model, data, path, file_format=None, chunk_size=CHUNK_SIZE,
+                d_avg=None):
+    """
+    export_data(model, data, path, file_format=None, chunk_size=CHUNK_SIZE,
+                d_avg=None) -> int
+
+    It exports data ('players' or 'evaluations', see EXPORTS) read by
+    model to path, in file_format or in the format of the path extension,
+    returning the number of rows exported. The players statistics are
+    the avg values of d_avg, by default read by model.get_players_stats.
+    """
+    if data not in EXPORTS:
+        raise ExportError("Unknown export data '%s', choose from: %s"
+                          % (data, ', '.join(sorted(EXPORTS))))
+    file_format = get_format(path, file_format)
+    columns = EXPORTS[data]
+    if data == 'players':
+        if d_avg is None:
+            d_avg = model.get_players_stats()
+        rows = iter_players_rows(model, d_avg, chunk_size)
+    else:
+        rows = model.iter_evaluations(chunk_size=chunk_size)
+    tmp_path = '%s.tmp' % path
+    try:
+        if file_format == 'npz':
+            with open(tmp_path, 'wb') as f:
+                count = WRITERS[file_format](f, columns, rows, chunk_size)
+        else:
+            with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+                count = WRITERS[file_format](f, columns, rows, chunk_size)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return count
@@ -0,0 +1,189 @@
+import logging
+import os
+import re
+import time
+from django.db import transaction
+from players.parser import count_lines, iter_file
+from players.progress import Progress
+from players.utils import chunks
+
+CHUNK_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def get_role(code):
+    """
+    get_role(code) -> string
+
+    It returns the string of role by player code passed as argument
+    """
+    if int(code) < 200:
+        return "goalkeeper"
+    elif 200 <= int(code) < 500:
+        return "defender"
+    elif 500 <= int(code) < 800:
+        return "midfielder"
+    elif int(code) >= 800:
+        return "forward"
+    else:
+        raise AttributeError('Not a Int input')
+
+
+def get_day_from_path(path):
+    """
+    get_day_from_path(path) -> int
+
+    It returns the day number extracted from the file name, i.e. 8 for
+    'MCC8.txt'. It raises IndexError if the file name has no number.
+    """
+    return int(re.findall(r'\d+', os.path.normpath(path))[-1])
+
+
+class Importer:
+    def __init__(self, model, progress=None, chunk_size=CHUNK_SIZE):
+        """
+        Importer(model, progress=None, chunk_size=CHUNK_SIZE)
+
+        It imports MagicCup txt files through the Model object model,
+        streaming the file records in chunks of chunk_size records.
+        progress is a players.progress.Progress reporter, by default
+        nothing is reported.
+        """
+        self.model = model
+        self.progress = progress or Progress()
+        self.chunk_size = chunk_size
+
+    def import_players(self, path, count=True):
+        """
+        import_players(path, count=True) -> (new, updated, unchanged)
+
+        It imports players on database from txt file, comparing the file
+        with the stored players: new codes are created with bulk inserts,
+        players with a different name or team are updated with bulk
+        updates and the other ones are skipped.
+        If count is False the file lines are not counted in advance and
+        the progress has no total.
+        """
+        start = time.perf_counter()
+        total = count_lines(path) if count else None
+        self.progress.start(total, "importing players")
+        players_map = self.model.get_players_map()
+        seen = set()
+        new = updated = count = 0
+        self.model.clear_bulk_players()
+        with transaction.atomic():
+            for chunk in chunks(iter_file(path), self.chunk_size):
+                changed_players = []
+                for code, name, real_team, fv, v, cost in chunk:
+                    count += 1
+                    self.progress.update(count)
+                    if code in seen:
+                        continue
+                    seen.add(code)
+                    role = get_role(code)
+                    player = players_map.get(code)
+                    if not player:
+                        self.model.add_new_player_to_bulk(
+                            code, name, real_team, role, cost)
+                        new += 1
+                    elif (name.upper() != player.name or
+                          real_team.upper() != player.real_team.upper()):
+                        player.name = name.upper()
+                        player.real_team = real_team.upper()
+                        player.role = role
+                        player.cost = cost
+                        changed_players.append(player)
+                updated += len(changed_players)
+                self.model.import_all_players()
+                self.model.clear_bulk_players()
+                self.model.update_players_bulk(changed_players)
+        self.progress.finish()
+        unchanged = len(seen) - new - updated
+        logger.info("players imported: %s rows, new %s, updated %s, "
+                    "unchanged %s in %.3fs", count, new, updated, unchanged,
+                    time.perf_counter() - start)
+        return new, updated, unchanged
+
+    def import_evaluations(self, path, day, count=True):
+        """
+        import_evaluations(path, day, count=True)
+            -> (rows, new_players, created, updated, deleted)
+
+        It imports the evaluations of day from txt file streaming its
+        records (see import_day_rows). If count is False the file lines
+        are not counted in advance and the progress has no total.
+        """
+        total = count_lines(path) if count else None
+        return self.import_day_rows(day, iter_file(path), total=total)
+
+    def import_day_rows(self, day, records, total=None):
+        """
+        import_day_rows(day, records, total=None)
+            -> (rows, new_players, created, updated, deleted)
+
+        It imports the evaluations of day from an iterable of Records
+        (see players.parser) in a single transaction. The records are
+        compared with the evaluations already stored for that day, so only
+        the new, changed and missing evaluations are written: importing
+        the same file twice changes nothing. Records are processed in
+        chunks, so a streamed file is never loaded in memory at once.
+        Players not found on database are created with one bulk insert
+        per chunk. total is the number of records shown by the progress,
+        by default the length of records if it is a sequence.
+        """
+        start = time.perf_counter()
+        if total is None and hasattr(records, '__len__'):
+            total = len(records)
+        self.progress.start(total, "importing day %s" % day)
+        rows = new_players = created = updated = 0
+        self.model.clear_bulk_evaluations()
+        self.model.clear_bulk_players()
+        with transaction.atomic():
+            stored = self.model.get_day_evaluations_map(day)
+            players_map = self.model.get_players_map()
+            imported = set()
+            for chunk in chunks(records, self.chunk_size):
+                new_codes = set()
+                for code, name, real_team, fv, v, cost in chunk:
+                    if code not in players_map and code not in new_codes:
+                        self.model.add_new_player_to_bulk(
+                            code, name, real_team, get_role(code), cost)
+                        new_codes.add(code)
+                        logger.debug("new player %s stored", code)
+                if new_codes:
+                    self.model.import_all_players()
+                    self.model.clear_bulk_players()
+                    players_map.update(self.model.get_players_map(new_codes))
+                    new_players += len(new_codes)
+                changed, old_rows = [], []
+                for code, name, real_team, fv, v, cost in chunk:
+                    rows += 1
+                    self.progress.update(rows)
+                    player = players_map[code]
+                    if player.id in imported:
+                        continue  # duplicated code, the first one wins
+                    imported.add(player.id)
+                    ev = stored.pop(player.id, None)
+                    if ev is None:
+                        self.model.add_new_ev_to_bulk(player, fv, v, cost, day)
+                        created += 1
+                    elif (ev.fanta_vote, ev.vote, ev.cost) != (fv, v, cost):
+                        old_rows.append(self.model.get_stat_row(ev))
+                        ev.fanta_vote, ev.vote, ev.cost = fv, v, cost
+                        changed.append(ev)
+                self.model.import_all_evaluations()
+                self.model.clear_bulk_evaluations()
+                self.model.update_evaluations_bulk(changed, old_rows)
+                updated += len(changed)
+            # stored evaluations of players missing from the file
+            deleted = len(stored)
+            if stored:
+                self.model.delete_evaluations_by_id(
+                    [ev.id for ev in stored.values()])
+        self.progress.finish()
+        logger.info("day %s imported: %s rows, %s new players, created %s, "
+                    "updated %s, deleted %s in %.3fs", day, rows,
+                    new_players, created, updated, deleted,
+                    time.perf_counter() - start)
+        return rows, new_players, created, updated, deleted
@@ -0,0 +1,232 @@
+"""
+Opt-in instrumentation of the Model methods and of the main operations
+(import, recompute, sort, report, export): for every one it records the
+calls, the cumulative time and the SQL queries executed, counted by a
+wrapper installed on every database connection.
+
+Nothing is wrapped until install() is called, by 'python main.py
+--instrument' or by the INSTRUMENT setting, so there is no overhead when
+it is off. The summary is written at exit.
+"""
+import atexit
+import functools
+import sys
+import threading
+import time
+from django.db import connections
+from django.db.backends.signals import connection_created
+from players.controller import Controller
+from players.importer import Importer
+from players.model import Model
+
+OPERATIONS = (
+    ('import', Importer, ('import_players', 'import_day_rows')),
+    ('recompute', Controller, ('compute_players_avg',)),
+    ('recompute', Model, ('rebuild_players_stats',)),
+    ('sort', Controller, ('get_sorted_players', 'get_sorted_players_by_cost',
+                          'get_players_ordered_by_avg',
+                          'get_sorted_evaluations')),
+    ('report', Controller, ('build_report',)),
+    ('export', Controller, ('export_data',)),
+)
+TOTAL = 'all queries'
+
+_recorder = None
+
+
+class Recorder:
+    def __init__(self):
+        """
+        Recorder()
+
+        It keeps calls, seconds and queries of every recorded name. The
+        queries are counted for all the wrapped calls running on the
+        thread executing them, nested calls included.
+        """
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.records = {}  # name: [calls, seconds, queries]
+        self.patched = []  # (cls, name, original attribute)
+
+    def get_active(self):
+        """
+        get_active() -> list
+
+        It returns the query counters of the wrapped calls running on the
+        current thread
+        """
+        active = getattr(self.local, 'active', None)
+        if active is None:
+            active = self.local.active = []
+        return active
+
+    def add(self, name, seconds, queries):
+        """
+        add(name, seconds, queries)
+
+        It records a call of name
+        """
+        with self.lock:
+            record = self.records.setdefault(name, [0, 0.0, 0])
+            record[0] += 1
+            record[1] += seconds
+            record[2] += queries
+
+    def wrap(self, name, func):
+        """
+        wrap(name, func) -> function
+
+        It returns func recording its calls with name
+        """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            active = self.get_active()
+            counter = [0]
+            active.append(counter)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                active.pop()
+                self.add(name, seconds, counter[0])
+        return wrapper
+
+    def patch(self, cls, attribute, name):
+        """
+        patch(cls, attribute, name)
+
+        It replaces the method attribute of cls with its wrapped version
+        """
+        original = cls.__dict__[attribute]
+        if isinstance(original, (staticmethod, classmethod)):
+            wrapped = type(original)(self.wrap(name, original.__func__))
+        else:
+            wrapped = self.wrap(name, original)
+        self.patched.append((cls, attribute, original))
+        setattr(cls, attribute, wrapped)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper counting the queries
+        """
+        for counter in self.get_active():
+            counter[0] += 1
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add(TOTAL, time.perf_counter() - start, 1)
+
+    def wrap_connection(self, connection):
+        """
+        wrap_connection(connection)
+
+        It installs the execute wrapper on connection, once
+        """
+        if self.execute_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self.execute_wrapper)
+
+    # noinspection PyUnusedLocal
+    def on_connection_created(self, sender, connection, **kwargs):
+        """
+        Receiver of the connection_created signal
+        """
+        self.wrap_connection(connection)
+
+    def install(self):
+        """
+        install()
+
+        It wraps the Model methods, the OPERATIONS methods and the
+        database connections
+        """
+        for attribute, value in sorted(vars(Model).items()):
+            if attribute.startswith('_'):
+                continue
+            if isinstance(value, (staticmethod, classmethod)) or \
+                    callable(value):
+                self.patch(Model, attribute, 'Model.%s' % attribute)
+        for operation, cls, attributes in OPERATIONS:
+            for attribute in attributes:
+                self.patch(cls, attribute, '%s: %s.%s'
+                           % (operation, cls.__name__, attribute))
+        connection_created.connect(self.on_connection_created)
+        for connection in connections.all(initialized_only=True):
+            self.wrap_connection(connection)
+
+    def uninstall(self):
+        """
+        uninstall()
+
+        It restores the original methods and stops counting the queries
+        """
+        for cls, attribute, original in reversed(self.patched):
+            setattr(cls, attribute, original)
+        self.patched = []
+        connection_created.disconnect(self.on_connection_created)
+        for connection in connections.all(initialized_only=True):
+            if self.execute_wrapper in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self.execute_wrapper)
+
+    def get_summary(self):
+        """
+        get_summary() -> list of tuples
+
+        It returns the (name, calls, seconds, queries) records, the
+        operations first, sorted by time
+        """
+        with self.lock:
+            records = [(name,) + tuple(record)
+                       for name, record in self.records.items()]
+        return sorted(records, key=lambda record: (
+            record[0] == TOTAL, record[0].startswith('Model.'), -record[2]))
+
+    def report(self, stream=None):
+        """
+        report(stream=None)
+
+        It writes the summary to stream, by default sys.stderr
+        """
+        stream = stream or sys.stderr
+        summary = self.get_summary()
+        if not summary:
+            return
+        stream.write("instrumentation summary:\n")
+        stream.write("  %-50s %8s %10s %8s\n"
+                     % ('name', 'calls', 'seconds', 'queries'))
+        for name, calls, seconds, queries in summary:
+            stream.write("  %-50s %8d %10.3f %8d\n"
+                         % (name, calls, seconds, queries))
+        stream.flush()
+
+
+def install(at_exit=True):
+    """
+    install(at_exit=True) -> Recorder
+
+    It starts the instrumentation, once, writing the summary at exit if
+    at_exit is True
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder()
+        _recorder.install()
+        if at_exit:
+            atexit.register(_recorder.report)
+    return _recorder
+
+
+def uninstall():
+    """
+    uninstall() -> Recorder or None
+
+    It stops the instrumentation, returning the recorder with the
+    recorded values
+    """
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None:
+        recorder.uninstall()
+        atexit.unregister(recorder.report)
+    return recorder
@@ -0,0 +1,73 @@
+import json
+import platform
+import shutil
+import tempfile
+import time
+import django
+from django.core.management.base import BaseCommand, CommandError
+from players.benchmark import (DAYS_PATH, SEASON_DAYS, SUITES, get_day_files,
+                               make_season)
+
+
+class Command(BaseCommand):
+    help = "Time the import and statistics paths on scratch databases"
+
+    def add_arguments(self, parser):
+        parser.add_argument('suites', nargs='*',
+                            help='suites to run (%s), by default all of them'
+                                 % ', '.join(sorted(SUITES)))
+        parser.add_argument('--days', default=DAYS_PATH,
+                            help='folder of the MCCnn.txt files to import')
+        parser.add_argument('--players', type=int,
+                            help='run on synthetic seasons of %s days with '
+                                 'this number of players instead of the '
+                                 '--days files' % SEASON_DAYS)
+        parser.add_argument('--seasons', type=int, default=1,
+                            help='number of synthetic seasons')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='random seed of the synthetic seasons')
+        parser.add_argument('--json',
+                            help='write the results to this json file')
+
+    def handle(self, *args, **options):
+        suites = options['suites'] or sorted(SUITES)
+        for suite in suites:
+            if suite not in SUITES:
+                raise CommandError("Unknown suite '%s', choose from: %s"
+                                   % (suite, ', '.join(sorted(SUITES))))
+        tmp_dir = None
+        if options['players']:
+            tmp_dir = tempfile.mkdtemp()
+            paths = make_season(tmp_dir, options['players'],
+                                options['seasons'], options['seed'])
+            data = {'players': options['players'],
+                    'seasons': options['seasons'], 'seed': options['seed']}
+        else:
+            paths = get_day_files(options['days'])
+            if not paths:
+                raise CommandError("No MCCnn.txt files found in %s"
+                                   % options['days'])
+            data = {'days': options['days']}
+        report = {'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'python': platform.python_version(),
+                  'django': django.get_version(),
+                  'data': dict(data, files=len(paths)), 'suites': {}}
+        try:
+            for suite in suites:
+                results = report['suites'][suite] = []
+                self.stdout.write("\n%s" % suite)
+                for result in SUITES[suite](paths):
+                    case, seconds, queries = (result + (None,))[:3]
+                    results.append({'case': case, 'seconds': seconds,
+                                    'queries': queries})
+                    line = "  %-40s %8.3fs" % (case, seconds)
+                    if queries is not None:
+                        line += " %8s queries" % queries
+                    self.stdout.write(line)
+        finally:
+            if tmp_dir:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        if options['json']:
+            with open(options['json'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write("results written to %s" % options['json'])
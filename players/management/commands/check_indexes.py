@@ -0,0 +1,97 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from players.models import Player, Evaluation
+
+PLAYER = Player._meta.db_table
+EVALUATION = Evaluation._meta.db_table
+
+
+class Command(BaseCommand):
+    help = ("Check with EXPLAIN QUERY PLAN that the most frequent queries "
+            "use the expected database indexes")
+
+    @staticmethod
+    def get_queries():
+        """
+        get_queries() -> list of (description, queryset, table, columns)
+
+        It returns the hot queries of players.model.Model with the table
+        and the columns of the index every one of them must use
+        """
+        return [
+            ('get_player_by_code', Player.objects.filter(code=100),
+             PLAYER, ('code',)),
+            ('get_players_by_role',
+             Player.objects.filter(role='goalkeeper').order_by('code'),
+             PLAYER, ('role',)),
+            ('get_evaluation',
+             Evaluation.objects.filter(player_id=1, day=1),
+             EVALUATION, ('day', 'player_id')),
+            ('get_evaluations', Evaluation.objects.filter(
+                day=1).order_by('player__code'),
+             EVALUATION, ('day', 'player_id')),
+            ('get_evaluations by role', Evaluation.objects.filter(
+                player__role='goalkeeper', day=1).order_by('player__code'),
+             EVALUATION, ('day', 'player_id')),
+            ('delete_day_evaluations',
+             Evaluation.objects.filter(day=1).values_list('player_id'),
+             EVALUATION, ('day', 'player_id')),
+            ('get_days',
+             Evaluation.objects.order_by('day').values('day').distinct(),
+             EVALUATION, ('day', 'player_id')),
+        ]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("check_indexes reads SQLite query plans, "
+                               "the database is %s" % connection.vendor)
+        failures = []
+        for description, queryset, table, columns in self.get_queries():
+            index = self.get_index_name(table, columns)
+            if index is None:
+                raise CommandError("No index on %s(%s), run 'migrate'"
+                                   % (table, ', '.join(columns)))
+            plan = queryset.explain()
+            self.stdout.write("%s (expected %s):\n  %s"
+                              % (description, index,
+                                 plan.replace('\n', '\n  ')))
+            if not self.uses_index(plan, table, index):
+                failures.append("%s does not use %s" % (description, index))
+        if failures:
+            raise CommandError("Unexpected query plan: %s"
+                               % ', '.join(failures))
+        self.stdout.write("All the queries use the expected index")
+
+    @staticmethod
+    def get_index_name(table, columns):
+        """
+        get_index_name(table, columns) -> string or None
+
+        It returns the name of the SQLite index of table on exactly
+        columns, in the same order; the unique constraints created with
+        the table have automatic names (sqlite_autoindex_<table>_N)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA index_list(%s)"
+                           % connection.ops.quote_name(table))
+            names = [row[1] for row in cursor.fetchall()]
+            for name in names:
+                cursor.execute("PRAGMA index_info(%s)"
+                               % connection.ops.quote_name(name))
+                info = sorted(cursor.fetchall())
+                if tuple(row[2] for row in info) == tuple(columns):
+                    return name
+        return None
+
+    @staticmethod
+    def uses_index(plan, table, index):
+        """
+        uses_index(plan, table, index) -> boolean
+
+        It returns True if a step of the SQLite query plan reads table
+        through index
+        """
+        step = re.compile(r'\b(SEARCH|SCAN) %s USING (COVERING )?INDEX %s\b'
+                          % (re.escape(table), re.escape(index)))
+        return any(step.search(line) for line in plan.splitlines())
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from players.model import Model
+from players.models import PlayerStat
+
+STAT_FIELDS = ('fv_sum', 'v_sum', 'evaluated', 'last_day', 'last_cost',
+               'fv_sq_sum', 'day_sum', 'day_sq_sum', 'day_fv_sum', 'recent')
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the players statistics from the evaluations and compare "
+            "them with the stored ones")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='store the rebuilt statistics')
+
+    def handle(self, *args, **options):
+        model = Model()
+        computed = model.compute_players_stats()
+        stored = model.get_stored_players_stats()
+        differences = 0
+        for player_id in sorted(set(computed) | set(stored)):
+            expected = self.get_values(computed.get(player_id))
+            found = self.get_values(stored.get(player_id))
+            if not self.is_equal(expected, found):
+                differences += 1
+                self.stdout.write("player id %s: expected %s, found %s"
+                                  % (player_id, expected, found))
+        if not differences:
+            self.stdout.write("Players statistics are consistent (%s players)"
+                              % len(computed))
+        elif options['fix']:
+            model.rebuild_players_stats()
+            self.stdout.write("%s players statistics rebuilt" % differences)
+        else:
+            raise CommandError("%s players statistics differ, use --fix to "
+                               "rebuild them" % differences)
+
+    @staticmethod
+    def get_values(stat):
+        """
+        get_values(stat) -> tuple
+
+        It returns the values of the PlayerStat object stat, the ones of
+        a player without evaluations if stat is None
+        """
+        if stat is None:
+            stat = PlayerStat()
+        return tuple(getattr(stat, field) for field in STAT_FIELDS)
+
+    @staticmethod
+    def is_equal(expected, found):
+        """
+        is_equal(expected, found) -> boolean
+
+        It compares two statistics rows with a tolerance on the floats
+        """
+        for value_a, value_b in zip(expected, found):
+            if isinstance(value_a, float) or isinstance(value_b, float):
+                if abs(value_a - value_b) >= 1e-6:
+                    return False
+            elif value_a != value_b:
+                return False
+        return True
@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from players.export import (CHUNK_SIZE, EXPORTS, FORMATS, ExportError,
+                            export_data)
+from players.model import Model
+
+
+class Command(BaseCommand):
+    help = ("Export the players statistics or the evaluations to a csv, "
+            "jsonl or npz file")
+
+    def add_arguments(self, parser):
+        parser.add_argument('data', choices=sorted(EXPORTS),
+                            help='data to export')
+        parser.add_argument('path',
+                            help='output file, the format is taken from '
+                                 'its extension if --format is not given')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='output format')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='rows read from database at a time')
+
+    def handle(self, *args, **options):
+        start = time.time()
+        try:
+            count = export_data(Model(), options['data'], options['path'],
+                                file_format=options['format'],
+                                chunk_size=options['chunk_size'])
+        except ExportError as e:
+            raise CommandError(str(e))
+        self.stdout.write("%s %s exported to %s in %.3fs"
+                          % (count, options['data'], options['path'],
+                             time.time() - start))
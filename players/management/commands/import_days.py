@@ -0,0 +1,88 @@
+import glob
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from players.importer import Importer, get_day_from_path
+from players.model import Model
+from players.parser import ParseError, parse_files
+
+
+class Command(BaseCommand):
+    help = ("Import players and MagicCup evaluations files (MCCnn.txt) "
+            "without the graphic interface")
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+',
+                            help='MCCnn.txt files or folders containing them')
+        parser.add_argument('--players',
+                            help='players file, by default the first day file '
+                                 'is used if there are no players on database')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='number of processes parsing the files')
+        parser.add_argument('--batch-size', type=int,
+                            help='rows written by every bulk insert, '
+                                 'by default settings.BULK_BATCH_SIZE')
+
+    def handle(self, *args, **options):
+        days = self.get_day_files(options['paths'])
+        if not days:
+            raise CommandError("No MCCnn.txt files found")
+        model = Model(batch_size=options['batch_size'])
+        importer = Importer(model)
+        players_path = options['players']
+        if not players_path and not model.get_players_count():
+            players_path = days[0][1]
+        if players_path:
+            start = time.time()
+            new, updated, unchanged = importer.import_players(
+                players_path, count=False)
+            self.stdout.write("players: new %s, updated %s, unchanged %s "
+                              "in %.3fs" % (new, updated, unchanged,
+                                            time.time() - start))
+        total_rows = 0
+        total_start = time.time()
+        # the files are streamed, or parsed in parallel with --workers,
+        # but written to the database by this process only, in day order
+        paths = [path for day, path in days]
+        try:
+            for (day, path), data in zip(days, parse_files(
+                    paths, workers=options['workers'])):
+                start = time.time()
+                rows, new_players, created, updated, deleted = \
+                    importer.import_day_rows(day, data)
+                elapsed = time.time() - start
+                total_rows += rows
+                self.stdout.write("day %s: %s rows (created %s, updated %s, "
+                                  "deleted %s), %s new players in %.3fs "
+                                  "(%d rows/s)"
+                                  % (day, rows, created, updated, deleted,
+                                     new_players, elapsed,
+                                     rows / max(elapsed, 1e-6)))
+        except ParseError as e:
+            raise CommandError(str(e))
+        elapsed = time.time() - total_start
+        self.stdout.write("%s days, %s rows in %.3fs (%d rows/s)"
+                          % (len(days), total_rows, elapsed,
+                             total_rows / max(elapsed, 1e-6)))
+
+    @staticmethod
+    def get_day_files(paths):
+        """
+        get_day_files(paths) -> list of tuples
+
+        It returns the (day, path) couples of the files passed as argument
+        and of the MCCnn.txt files found in folders, sorted by day
+        """
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(glob.glob(os.path.join(path, 'MCC*.txt')))
+            elif os.path.isfile(path):
+                files.append(path)
+            else:
+                raise CommandError("File not found: %s" % path)
+        try:
+            return sorted((get_day_from_path(path), path) for path in files)
+        except IndexError:
+            raise CommandError("Invalid filename! "
+                               "Name must contain at least a number")
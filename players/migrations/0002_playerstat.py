@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_player_stats(apps, schema_editor):
+    """
+    It builds the running statistics of the evaluations already stored
+    """
+    Evaluation = apps.get_model('players', 'Evaluation')
+    PlayerStat = apps.get_model('players', 'PlayerStat')
+    stats = {}
+    evaluations = Evaluation.objects.order_by('player_id', 'day').values_list(
+        'player_id', 'day', 'vote', 'fanta_vote', 'cost')
+    for player_id, day, vote, fanta_vote, cost in evaluations.iterator():
+        stat = stats.setdefault(player_id, PlayerStat(player_id=player_id))
+        if vote > 0:
+            stat.fv_sum += fanta_vote
+            stat.v_sum += vote
+            stat.evaluated += 1
+        stat.last_day = day
+        stat.last_cost = cost
+    PlayerStat.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fv_sum', models.FloatField(default=0.0)),
+                ('v_sum', models.FloatField(default=0.0)),
+                ('evaluated', models.IntegerField(default=0)),
+                ('last_day', models.IntegerField(default=0)),
+                ('last_cost', models.IntegerField(null=True)),
+                ('player', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='players.Player')),
+            ],
+        ),
+        migrations.RunPython(populate_player_stats,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def remove_duplicates(apps, schema_editor):
+    """
+    It removes duplicated players codes, moving their evaluations to the
+    oldest player, and duplicated evaluations of the same day, keeping
+    the last imported one, so that the unique indexes can be created
+    """
+    Player = apps.get_model('players', 'Player')
+    Evaluation = apps.get_model('players', 'Evaluation')
+    PlayerStat = apps.get_model('players', 'PlayerStat')
+    changed = False
+    duplicated_codes = Player.objects.values('code').annotate(
+        count=Count('id'), first_id=Min('id')).filter(count__gt=1)
+    for duplicated in duplicated_codes:
+        duplicates = Player.objects.filter(code=duplicated['code']).exclude(
+            id=duplicated['first_id'])
+        Evaluation.objects.filter(player__in=duplicates).update(
+            player_id=duplicated['first_id'])
+        duplicates.delete()
+        changed = True
+    duplicated_evaluations = Evaluation.objects.values(
+        'day', 'player_id').annotate(count=Count('id'),
+                                     last_id=Max('id')).filter(count__gt=1)
+    for duplicated in duplicated_evaluations:
+        Evaluation.objects.filter(
+            day=duplicated['day'], player_id=duplicated['player_id']).exclude(
+            id=duplicated['last_id']).delete()
+        changed = True
+    if changed:
+        # rebuild the running statistics of migration 0002
+        PlayerStat.objects.all().delete()
+        stats = {}
+        evaluations = Evaluation.objects.order_by(
+            'player_id', 'day').values_list('player_id', 'day', 'vote',
+                                            'fanta_vote', 'cost')
+        for player_id, day, vote, fanta_vote, cost in evaluations.iterator():
+            stat = stats.setdefault(player_id, PlayerStat(player_id=player_id))
+            if vote > 0:
+                stat.fv_sum += fanta_vote
+                stat.v_sum += vote
+                stat.evaluated += 1
+            stat.last_day = day
+            stat.last_cost = cost
+        PlayerStat.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0002_playerstat'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='player',
+            name='code',
+            field=models.IntegerField(unique=True),
+        ),
+        migrations.AlterField(
+            model_name='player',
+            name='role',
+            field=models.CharField(db_index=True, max_length=25),
+        ),
+        migrations.AddConstraint(
+            model_name='evaluation',
+            constraint=models.UniqueConstraint(fields=('day', 'player'), name='unique_day_player'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+RECENT_DAYS = 5
+
+
+def populate_form(apps, schema_editor):
+    """
+    It fills the new running statistics (sums for std and trend, recent
+    fanta_votes) from the evaluations already stored
+    """
+    Evaluation = apps.get_model('players', 'Evaluation')
+    PlayerStat = apps.get_model('players', 'PlayerStat')
+    stats = {stat.player_id: stat for stat in PlayerStat.objects.all()}
+    evaluations = Evaluation.objects.filter(vote__gt=0).order_by(
+        'player_id', 'day').values_list('player_id', 'day', 'fanta_vote')
+    for player_id, day, fanta_vote in evaluations.iterator():
+        stat = stats.get(player_id)
+        if not stat:
+            continue
+        stat.fv_sq_sum += fanta_vote * fanta_vote
+        stat.day_sum += day
+        stat.day_sq_sum += day * day
+        stat.day_fv_sum += day * fanta_vote
+        recent = stat.recent.split()[-(RECENT_DAYS - 1):]
+        recent.append(str(fanta_vote))
+        stat.recent = ' '.join(recent)
+    PlayerStat.objects.all().delete()
+    PlayerStat.objects.bulk_create(stats.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='playerstat',
+            name='day_fv_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='playerstat',
+            name='day_sq_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playerstat',
+            name='day_sum',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='playerstat',
+            name='fv_sq_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='playerstat',
+            name='recent',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.RunPython(populate_form, migrations.RunPython.noop),
+    ]
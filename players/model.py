@@ -1,10 +1,42 @@
-from players.models import Player, Evaluation
-from django.db.models import Avg, Max
+import logging
+from players.models import Player, Evaluation, PlayerStat
+from players.season import SeasonMatrix
+from players.stats import (add_evaluation, count_evaluation, get_form,
+                           get_std, get_trend, parse_recent, push_recent,
+                           PlayerAvg, RECENT_DAYS)
+from players.utils import chunks
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Sum, Window
+from django.db.models.functions import RowNumber
+
+BATCH_SIZE = 500
+IGNORE = 'ignore'
+UPDATE = 'update'
+CONFLICTS = (None, IGNORE, UPDATE)
+
+logger = logging.getLogger(__name__)
 
 
 class Model:
-    def __init__(self):
+    def __init__(self, batch_size=None, conflicts=None):
+        """
+        Model(batch_size=None, conflicts=None)
+
+        The bulk lists are written to database every batch_size objects,
+        by default settings.BULK_BATCH_SIZE (0 writes them only when
+        import_all_players/import_all_evaluations is called).
+        conflicts is what bulk inserts do with rows already stored
+        (same player code, same day and player): None raises
+        IntegrityError, IGNORE skips them and UPDATE overwrites them.
+        """
         super(Model, self).__init__()
+        if conflicts not in CONFLICTS:
+            raise ValueError("conflicts must be one of %s" % (CONFLICTS,))
+        if batch_size is None:
+            batch_size = getattr(settings, 'BULK_BATCH_SIZE', BATCH_SIZE)
+        self.batch_size = batch_size or None
+        self.conflicts = conflicts
         self.temporary_object = None
         self.bulk_players_to_create = []
         self.bulk_evaluations_to_create = []
@@ -16,7 +48,7 @@ class Model:
 
         It stores the object passed as argument to get later
         """
-        print("INFO: Set temporary object to %s" % obj)
+        logger.debug("set temporary object to %s", obj)
         self.temporary_object = obj
 
     def get_temporary_object(self):
@@ -25,9 +57,18 @@ class Model:
 
         It returns the temporary object stored previously
         """
-        print("INFO: Retrieve temporary object %s" % self.temporary_object)
+        logger.debug("retrieve temporary object %s", self.temporary_object)
         return self.temporary_object
 
+    @staticmethod
+    def close_connection():
+        """
+        close_connection()
+
+        It closes the database connection of the calling thread
+        """
+        connection.close()
+
     def set_day(self, value):
         """
         set_day(int)
@@ -62,9 +103,11 @@ class Model:
         get_players_data() -> dictionary
 
         it returns a dictionary in format with couple key: value
-        player.code: (player.name, player.real_team)
+        player.code: (player.name, player.real_team), loaded with a single
+        query without building the Player objects
         """
-        return {p.code: (p.name, p.real_team) for p in self.get_players()}
+        return {code: (name, real_team) for code, name, real_team in
+                Player.objects.values_list('code', 'name', 'real_team')}
 
     @staticmethod
     def get_player_by_code(code):
@@ -75,6 +118,20 @@ class Model:
         """
         return Player.objects.filter(code=int(code)).first()
 
+    @staticmethod
+    def get_players_map(codes=None):
+        """
+        get_players_map(codes=None) -> dictionary
+
+        It returns a dictionary in format player.code: Player object
+        for all the players, or only for the players with code in codes,
+        loaded with a single query
+        """
+        players = Player.objects.all()
+        if codes is not None:
+            players = players.filter(code__in=[int(code) for code in codes])
+        return {p.code: p for p in players}
+
     @staticmethod
     def get_players():
         """
@@ -84,14 +141,42 @@ class Model:
         """
         return Player.objects.order_by('code').all()
 
+    def get_conflict_options(self, unique_fields, update_fields):
+        """
+        get_conflict_options(unique_fields, update_fields) -> dictionary
+
+        It returns the bulk_create keyword arguments for the conflicts
+        behaviour of the model
+        """
+        if self.conflicts == IGNORE:
+            return {'ignore_conflicts': True}
+        if self.conflicts == UPDATE:
+            return {'update_conflicts': True, 'unique_fields': unique_fields,
+                    'update_fields': update_fields}
+        return {}
+
     def import_all_players(self):
         """
         import_all_players()
 
-        It creates all objects in bulk_players_to_create list at a time
-        with only a commit operation
+        It creates all objects in bulk_players_to_create list with
+        inserts of batch_size rows in a single transaction
+        """
+        Player.objects.bulk_create(
+            self.bulk_players_to_create, batch_size=self.batch_size,
+            **self.get_conflict_options(
+                ['code'], ['name', 'real_team', 'role', 'cost']))
+
+    @staticmethod
+    def update_players_bulk(players):
         """
-        Player.objects.bulk_create(self.bulk_players_to_create)
+        update_players_bulk(players)
+
+        It saves the name, real_team, role and cost of all the Player
+        objects passed as argument with a single bulk update
+        """
+        Player.objects.bulk_update(players,
+                                   ['name', 'real_team', 'role', 'cost'])
 
     def clear_bulk_players(self):
         """
@@ -138,17 +223,10 @@ class Model:
         player = Player(code=int(code), name=u'%s' % name.upper(),
                         real_team=real_team, role=role.lower(), cost=int(cost))
         self.bulk_players_to_create.append(player)
-
-    @staticmethod
-    def get_players_ordered_by_filter(filter_name, role):
-        """
-        get_players_ordered_by_filter(filter_name, role) -> list of Players
-
-        It returns a list of Player objects filtered by role and
-        sorted by filter_name
-        """
-        return Player.objects.filter(role=role.lower()).order_by(
-            filter_name).all()
+        if self.batch_size and \
+                len(self.bulk_players_to_create) >= self.batch_size:
+            self.import_all_players()
+            self.clear_bulk_players()
 
     @staticmethod
     def get_players_by_role(role):
@@ -174,7 +252,7 @@ class Model:
         player.role = role.lower()
         player.cost = int(cost)
         player.save()
-        print("INFO: Player %s updated!" % name)
+        logger.debug("player %s updated", name)
         return player
 
     def new_evaluation(self, code, fv, v, cost, day):
@@ -185,9 +263,11 @@ class Model:
         """
         player = self.get_player_by_code(int(code))
         if player:
-            ev = Evaluation.objects.create(fanta_vote=float(fv),
-                                           vote=float(v), cost=int(cost),
-                                           player=player, day=int(day))
+            with transaction.atomic():
+                ev = Evaluation.objects.create(fanta_vote=float(fv),
+                                               vote=float(v), cost=int(cost),
+                                               player=player, day=int(day))
+                self.update_players_stats(added=[self.get_stat_row(ev)])
             return ev
 
     @staticmethod
@@ -201,9 +281,22 @@ class Model:
         if role:
             return Evaluation.objects.filter(
                 player__role=role.lower(),
-                day=int(day)).order_by('player__code').all()
+                day=int(day)).select_related('player').order_by(
+                'player__code').all()
         return Evaluation.objects.filter(
-            day=int(day)).order_by('player__code').all()
+            day=int(day)).select_related('player').order_by(
+            'player__code').all()
+
+    @staticmethod
+    def get_day_evaluations_map(day):
+        """
+        get_day_evaluations_map(day) -> dictionary
+
+        It returns a dictionary in format player.id: Evaluation object
+        of all the evaluations with day=day
+        """
+        return {ev.player_id: ev
+                for ev in Evaluation.objects.filter(day=int(day))}
 
     def get_evaluation(self, code, day):
         """
@@ -214,18 +307,6 @@ class Model:
         player = self.get_player_by_code(int(code))
         return Evaluation.objects.filter(player=player, day=int(day)).first()
 
-    @staticmethod
-    def get_evaluations_ordered_by_filter(filter_name, role, day):
-        """
-        get_evaluations_ordered_by_filter(filter_name, role, day)
-            -> list of Evaluations
-
-        It returns a list of Evaluation objects filtered by role, day and
-        sorted by filter_name
-        """
-        return Evaluation.objects.filter(player__role=role.lower(),
-                                         day=day).order_by(filter_name).all()
-
     def update_evaluation(self, code, fv, v, cost, day):
         """
         update_evaluation(code, fv, v, cost, day) -> Evaluation object
@@ -235,25 +316,49 @@ class Model:
         ev = self.get_evaluation(int(code), day)
         if not ev:
             ev = self.get_temporary_object()
-        ev.fanta_vote = fv
-        ev.vote = v
-        ev.cost = cost
-        ev.save()
+        old_row = self.get_stat_row(ev)
+        ev.fanta_vote = float(fv)
+        ev.vote = float(v)
+        ev.cost = int(cost)
+        with transaction.atomic():
+            ev.save()
+            self.update_players_stats(removed=[old_row],
+                                      added=[self.get_stat_row(ev)])
         return ev
 
-    def add_new_ev_to_bulk(self, code, fv, v, cost, day):
+    def update_evaluations_bulk(self, evaluations, old_rows):
         """
-        add_new_ev_to_bulk(code, fv, v, cost, day)
+        update_evaluations_bulk(evaluations, old_rows)
 
-        It adds a new Evaluation object to bulk_evaluations_to_create list
+        It saves fanta_vote, vote and cost of the Evaluation objects
+        passed as argument and updates the players statistics.
+        old_rows are the statistics rows (see get_stat_row) of the
+        evaluations before the changes.
         """
+        with transaction.atomic():
+            # single row updates are faster than bulk_update CASE clauses
+            for ev in evaluations:
+                Evaluation.objects.filter(pk=ev.pk).update(
+                    fanta_vote=ev.fanta_vote, vote=ev.vote, cost=ev.cost)
+            self.update_players_stats(
+                removed=old_rows,
+                added=[self.get_stat_row(ev) for ev in evaluations])
 
-        player = self.get_player_by_code(int(code))
-        print("INFO: add new evaluation to code -> %s" % code)
-        # print code, fv, v, cost, day
+    def add_new_ev_to_bulk(self, player, fv, v, cost, day):
+        """
+        add_new_ev_to_bulk(player, fv, v, cost, day)
+
+        It adds a new Evaluation object of Player object player
+        to bulk_evaluations_to_create list
+        """
+        logger.debug("add new evaluation to code -> %s", player.code)
         ev = Evaluation(fanta_vote=float(fv), vote=float(v),
                         cost=int(cost), day=int(day), player=player)
         self.bulk_evaluations_to_create.append(ev)
+        if self.batch_size and \
+                len(self.bulk_evaluations_to_create) >= self.batch_size:
+            self.import_all_evaluations()
+            self.clear_bulk_evaluations()
 
     @staticmethod
     def get_days():
@@ -265,24 +370,43 @@ class Model:
         return [ev['day'] for ev in
                 Evaluation.objects.order_by('day').values('day').distinct()]
 
-    @staticmethod
-    def delete_day_evaluations(day):
+    def delete_day_evaluations(self, day):
         """
         delete_day_evaluations(day)
 
         It deletes all the evaluations stored in database with day=day
         """
-        Evaluation.objects.filter(day=int(day)).all().delete()
+        self.delete_evaluations(Evaluation.objects.filter(day=int(day)))
 
-    @staticmethod
-    def delete_evaluation(code, day):
+    def delete_evaluation(self, code, day):
         """
         delete_evaluation(code, day)
 
         It deletes the evaluation of day=day and player.code=code
         """
-        Evaluation.objects.filter(player__code=int(code),
-                                  day=int(day)).all().delete()
+        self.delete_evaluations(Evaluation.objects.filter(
+            player__code=int(code), day=int(day)))
+
+    def delete_evaluations_by_id(self, ids):
+        """
+        delete_evaluations_by_id(ids)
+
+        It deletes the evaluations with id in ids
+        """
+        self.delete_evaluations(Evaluation.objects.filter(id__in=ids))
+
+    def delete_evaluations(self, evaluations):
+        """
+        delete_evaluations(evaluations)
+
+        It deletes the evaluations of the queryset passed as argument
+        and removes them from the players statistics
+        """
+        with transaction.atomic():
+            rows = list(evaluations.values_list(
+                'player_id', 'day', 'vote', 'fanta_vote', 'cost'))
+            evaluations.delete()
+            self.update_players_stats(removed=rows)
 
     @staticmethod
     def delete_all_evaluations():
@@ -291,16 +415,60 @@ class Model:
 
         It deletes all the evaluations stored in database
         """
-        Evaluation.objects.all().delete()
+        with transaction.atomic():
+            Evaluation.objects.all().delete()
+            PlayerStat.objects.all().delete()
+
+    def get_stored_evaluations(self, evaluations):
+        """
+        get_stored_evaluations(evaluations) -> dictionary
+
+        It returns the stored evaluations with the same day and player
+        of the Evaluation objects passed as argument, in format
+        (day, player.id): Evaluation object
+        """
+        stored = {}
+        for chunk in chunks(evaluations, self.batch_size or BATCH_SIZE):
+            keys = {(ev.day, ev.player_id) for ev in chunk}
+            for ev in Evaluation.objects.filter(
+                    day__in={day for day, player_id in keys},
+                    player_id__in={player_id for day, player_id in keys}):
+                if (ev.day, ev.player_id) in keys:
+                    stored[(ev.day, ev.player_id)] = ev
+        return stored
 
     def import_all_evaluations(self):
         """
         import_all_evaluations()
 
-        It creates all objects in bulk_evaluations_to_create list at a time
-        with only a commit operation
-        """
-        Evaluation.objects.bulk_create(self.bulk_evaluations_to_create)
+        It creates all objects in bulk_evaluations_to_create list with
+        inserts of batch_size rows in a single transaction, updating
+        the players statistics
+        """
+        evaluations = self.bulk_evaluations_to_create
+        removed = []
+        with transaction.atomic():
+            if self.conflicts:
+                # the statistics must count every day and player once
+                unique = {}
+                for ev in evaluations:
+                    key = (ev.day, ev.player_id)
+                    if self.conflicts == UPDATE or key not in unique:
+                        unique[key] = ev
+                stored = self.get_stored_evaluations(evaluations)
+                if self.conflicts == IGNORE:
+                    evaluations = [ev for key, ev in unique.items()
+                                   if key not in stored]
+                else:
+                    evaluations = list(unique.values())
+                    removed = [self.get_stat_row(ev) for ev in stored.values()]
+            Evaluation.objects.bulk_create(
+                evaluations, batch_size=self.batch_size,
+                **self.get_conflict_options(
+                    ['day', 'player'], ['vote', 'fanta_vote', 'cost']))
+            self.update_players_stats(
+                added=[self.get_stat_row(ev) for ev in evaluations],
+                removed=removed)
 
     def clear_bulk_evaluations(self):
         """
@@ -310,6 +478,25 @@ class Model:
         """
         self.bulk_evaluations_to_create = []
 
+    @staticmethod
+    def get_data_fingerprint():
+        """
+        get_data_fingerprint() -> string
+
+        It returns a fingerprint of the stored players and evaluations,
+        computed with an aggregate query per table: it changes with every
+        import, new, changed or deleted row, whatever wrote it
+        """
+        evaluations = Evaluation.objects.aggregate(
+            count=Count('id'), max_id=Max('id'),
+            fanta_vote=Sum(F('id') * F('fanta_vote')),
+            vote=Sum(F('id') * F('vote')), cost=Sum(F('id') * F('cost')),
+            day=Sum(F('id') * F('day')), player=Sum(F('id') * F('player_id')))
+        players = Player.objects.aggregate(
+            count=Count('id'), max_id=Max('id'),
+            code=Sum(F('id') * F('code')), cost=Sum(F('id') * F('cost')))
+        return repr((sorted(evaluations.items()), sorted(players.items())))
+
     @staticmethod
     def get_last_imported_day():
         """
@@ -320,52 +507,200 @@ class Model:
         return Evaluation.objects.aggregate(Max('day')).get('day__max')
 
     @staticmethod
-    def get_avg(player, field):
+    def get_stat_row(ev):
+        """
+        get_stat_row(ev) -> tuple
+
+        It returns the values of an Evaluation object used by the players
+        statistics: (player_id, day, vote, fanta_vote, cost)
+        """
+        return (ev.player_id, int(ev.day), float(ev.vote),
+                float(ev.fanta_vote), int(ev.cost))
+
+    @staticmethod
+    def get_last_evaluations(player_ids, count=1, evaluated=False):
+        """
+        get_last_evaluations(player_ids, count=1, evaluated=False)
+            -> queryset
+
+        It returns the last count evaluations of every player in
+        player_ids (only the evaluated ones, vote > 0, if evaluated is
+        True) sorted by player and day, ranking the days of every player
+        with a window function
+        """
+        evaluations = Evaluation.objects.filter(player_id__in=player_ids)
+        if evaluated:
+            evaluations = evaluations.filter(vote__gt=0)
+        return evaluations.annotate(rank=Window(
+            RowNumber(), partition_by=F('player_id'),
+            order_by=F('day').desc())).filter(rank__lte=count).order_by(
+            'player_id', 'day')
+
+    def update_players_stats(self, added=(), removed=()):
+        """
+        update_players_stats(added=(), removed=())
+
+        It updates in place the running statistics of the players involved
+        by the added and removed evaluation rows (see get_stat_row).
+        It must be called after the evaluations have been written.
+        The sums are adjusted by every row, whatever its day, so the cost
+        depends only on the number of rows passed. Only the values that
+        can not be adjusted are read again, with the last evaluations of
+        the players involved (see get_last_evaluations): the last day and
+        cost if the last day of a player has been removed, the recent
+        fanta_votes if an evaluated day has been removed or an older one
+        added.
+        """
+        player_ids = {row[0] for row in added} | {row[0] for row in removed}
+        if not player_ids:
+            return
+        stats = {stat.player_id: stat for stat in
+                 PlayerStat.objects.filter(player_id__in=player_ids)}
+        replaced = {(row[0], row[1]) for row in added}
+        stale_last, stale_recent = set(), set()
+        for player_id, day, vote, fanta_vote, cost in removed:
+            stat = stats.get(player_id)
+            if not stat:
+                continue
+            count_evaluation(stat, day, vote, fanta_vote, sign=-1)
+            if day == stat.last_day and (player_id, day) not in replaced:
+                stale_last.add(player_id)
+            if vote > 0:
+                stale_recent.add(player_id)
+        for player_id, day, vote, fanta_vote, cost in sorted(
+                added, key=lambda row: row[1]):
+            stat = stats.get(player_id)
+            if not stat:
+                stat = stats[player_id] = PlayerStat(player_id=player_id)
+            if player_id not in stale_last and day >= stat.last_day:
+                add_evaluation(stat, day, vote, fanta_vote, cost)
+            else:
+                count_evaluation(stat, day, vote, fanta_vote)
+                if vote > 0:
+                    stale_recent.add(player_id)
+        for chunk in chunks(stale_last, BATCH_SIZE):
+            for player_id in chunk:
+                stats[player_id].last_day, stats[player_id].last_cost = 0, None
+            for player_id, day, cost in self.get_last_evaluations(
+                    chunk).values_list('player_id', 'day', 'cost'):
+                stats[player_id].last_day = day
+                stats[player_id].last_cost = cost
+        for chunk in chunks(stale_recent, BATCH_SIZE):
+            for player_id in chunk:
+                stats[player_id].recent = ''
+            for player_id, fanta_vote in self.get_last_evaluations(
+                    chunk, RECENT_DAYS, evaluated=True).values_list(
+                    'player_id', 'fanta_vote'):
+                stats[player_id].recent = push_recent(
+                    stats[player_id].recent, fanta_vote)
+        # delete and insert again: bulk_update builds a CASE expression per
+        # row and is much slower than a bulk insert on SQLite.
+        # The players left without evaluations have no statistics.
+        with transaction.atomic():
+            PlayerStat.objects.filter(player_id__in=player_ids).delete()
+            PlayerStat.objects.bulk_create(
+                [stat for stat in stats.values() if stat.last_day])
+
+    @staticmethod
+    def compute_players_stats():
+        """
+        compute_players_stats() -> dictionary
+
+        It computes from scratch the running statistics of all the players
+        on the arrays of all the evaluations (see players.season).
+        It returns a dictionary with format player.id: PlayerStat object
+        (not saved) for every player with at least one evaluation.
+        """
+        return SeasonMatrix.load().get_players_stats()
+
+    def rebuild_players_stats(self):
         """
-        get_avg(player, field) -> value
+        rebuild_players_stats()
 
-        it returns the avg value of player field
+        It deletes the stored players statistics and rebuilds them
+        from all the evaluations
         """
-        return Evaluation.objects.filter(player=player).aggregate(
-            Avg('%s' % field)).get('%s__avg' % field)
+        stats = self.compute_players_stats()
+        with transaction.atomic():
+            PlayerStat.objects.all().delete()
+            PlayerStat.objects.bulk_create(stats.values(),
+                                           batch_size=self.batch_size)
 
     @staticmethod
-    def get_evaluated(player):
+    def get_stored_players_stats():
         """
-        get_evaluated(player) -> int
+        get_stored_players_stats() -> dictionary
 
-        it returns the value of evaluated days
+        It returns the stored running statistics with the same format
+        of compute_players_stats
         """
-        return Evaluation.objects.filter(player=player).filter(
-            vote__gt=0).count()
+        return {stat.player_id: stat for stat in PlayerStat.objects.all()}
 
     @staticmethod
-    def get_fv_avg(player):
+    def iter_players(chunk_size=BATCH_SIZE):
         """
-        get_fv_avg(player) -> float
+        iter_players(chunk_size=BATCH_SIZE) -> iterator of tuples
 
-        it returns the fanta vote avg value of a player
+        It yields all the players, sorted by code, with format:
+        (code, name, real_team, role, cost).
+        The rows are read chunk_size at a time.
         """
-        evaluations = player.evaluation_set.all()
-        f_votes = [e.fanta_vote for e in evaluations if e.vote > 0]
-        fv_avg = float(sum(f_votes))/len(f_votes)
-        return fv_avg
+        players = Player.objects.order_by('code').values_list(
+            'code', 'name', 'real_team', 'role', 'cost')
+        return players.iterator(chunk_size=chunk_size)
 
     @staticmethod
-    def get_v_avg(player, fanta=True):
-        """
-        get_v_avg(player, fanta=True) -> float
-
-        it returns the fanta vote avg value of a player if flag 'fanta'
-        is True, else it returns the pure vote avg value.
-        """
-        evaluations = player.evaluation_set.all()
-        if fanta:
-            votes = [e.fanta_vote for e in evaluations if e.vote > 0]
-        else:
-            votes = [e.vote for e in evaluations if e.vote > 0]
-        try:
-            v_avg = float(sum(votes))/len(votes)
-            return v_avg
-        except ZeroDivisionError:
-            return 0.0
+    def iter_evaluations(chunk_size=BATCH_SIZE):
+        """
+        iter_evaluations(chunk_size=BATCH_SIZE) -> iterator of tuples
+
+        It yields all the evaluations, sorted by day and player code, with
+        format: (code, day, fanta_vote, vote, cost).
+        The rows are read chunk_size at a time.
+        """
+        evaluations = Evaluation.objects.order_by(
+            'day', 'player__code').values_list(
+            'player__code', 'day', 'fanta_vote', 'vote', 'cost')
+        return evaluations.iterator(chunk_size=chunk_size)
+
+    def get_players_stats(self):
+        """
+        get_players_stats() -> dictionary
+
+        It returns a dictionary with format player.code: PlayerAvg object
+        (see players.stats.PlayerAvg) of all the players in code order
+        (the report keeps it for the ties of its sort), read with a
+        single query from the stored running statistics. The statistics
+        are kept updated by every change of the evaluations (see
+        update_players_stats) and rebuilt by rebuild_players_stats, so
+        this is the only source of the players avg values.
+        """
+        days = self.get_days()
+        last_day = days[-1] if days else None
+        stats = Player.objects.order_by('code').values_list(
+            'code', 'cost', 'playerstat__evaluated', 'playerstat__fv_sum',
+            'playerstat__v_sum', 'playerstat__fv_sq_sum',
+            'playerstat__day_sum', 'playerstat__day_sq_sum',
+            'playerstat__day_fv_sum', 'playerstat__recent',
+            'playerstat__last_day', 'playerstat__last_cost')
+        d_avg = {}
+        for (code, cost, evaluated, fv_sum, v_sum, fv_sq_sum, day_sum,
+             day_sq_sum, day_fv_sum, recent, day, last_cost) in stats:
+            if day is None or day != last_day:
+                last_cost, delta_cost = cost, None
+            else:
+                delta_cost = last_cost - cost
+            if evaluated:
+                avg = PlayerAvg(fv_sum / evaluated, v_sum / evaluated,
+                                100 * evaluated / float(len(days)),
+                                last_cost, delta_cost)
+                values = parse_recent(recent)
+                avg.set_form(sum(values) / len(values) if values else 0.0,
+                             get_form(values),
+                             get_trend(evaluated, day_sum, fv_sum,
+                                       day_fv_sum, day_sq_sum),
+                             get_std(evaluated, fv_sum, fv_sq_sum))
+            else:
+                avg = PlayerAvg(0.0, 0.0, 0.0, last_cost, delta_cost)
+            d_avg[code] = avg
+        return d_avg
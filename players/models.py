@@ -3,10 +3,10 @@ from django.db import models
 
 
 class Player(models.Model):
-    code = models.IntegerField()
+    code = models.IntegerField(unique=True)
     name = models.CharField(max_length=50)
     real_team = models.CharField(max_length=3)
-    role = models.CharField(max_length=25)
+    role = models.CharField(max_length=25, db_index=True)
     cost = models.IntegerField()
     objects = models.Manager()  # pycharm inspection workaround
 
@@ -22,6 +22,33 @@ class Evaluation(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE)
     objects = models.Manager()  # pycharm inspection workaround
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'player'],
+                                    name='unique_day_player'),
+        ]
+
     # noinspection PyUnresolvedReferences
     def __unicode__(self):
         return '[%s][%s]' % (self.day, self.player.code)
+
+
+class PlayerStat(models.Model):
+    player = models.OneToOneField(Player, on_delete=models.CASCADE)
+    fv_sum = models.FloatField(default=0.0)
+    v_sum = models.FloatField(default=0.0)
+    evaluated = models.IntegerField(default=0)
+    last_day = models.IntegerField(default=0)
+    last_cost = models.IntegerField(null=True)
+    # running sums of the evaluated days for std and trend of fanta_vote
+    fv_sq_sum = models.FloatField(default=0.0)
+    day_sum = models.IntegerField(default=0)
+    day_sq_sum = models.IntegerField(default=0)
+    day_fv_sum = models.FloatField(default=0.0)
+    # fanta_votes of the last RECENT_DAYS evaluated days (see players.stats)
+    recent = models.CharField(max_length=100, default='', blank=True)
+    objects = models.Manager()  # pycharm inspection workaround
+
+    # noinspection PyUnresolvedReferences
+    def __unicode__(self):
+        return '[%s] stats' % self.player.code
@@ -0,0 +1,115 @@
+"""
+Streaming parser of the MagicCup txt files (MCCnn.txt) with format:
+    'code|NAME|TEAM|fanta voto|voto|quotazione'
+
+This module does not depend on django, so that the files can be
+parsed by worker processes.
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+
+ENCODING = 'utf-8'
+Record = namedtuple('Record', 'code name real_team fv v cost')
+
+
+class ParseError(ValueError):
+    pass
+
+
+def parse_line(line, line_number=None):
+    """
+    parse_line(line, line_number=None) -> Record
+
+    It returns the typed Record (code, name, real_team, fv, v, cost) of a
+    MagicCup line, i.e. '100|NAME|ROM|6.5|6.5|19'.
+    It raises ParseError if the line is not valid.
+    """
+    # avoid Non-break spaces
+    values = line.replace('\xa0', '').split('|')
+    try:
+        code, name, real_team, fv, v, cost = values
+        return Record(int(code), name.strip(), real_team.strip(), float(fv),
+                      float(v), int(cost))
+    except ValueError:
+        raise ParseError("Invalid line %s: '%s', format must be "
+                         "nnn|NAME|TEAM|n.n|n.n|n" % (line_number, line))
+
+
+def iter_records(f, encoding=ENCODING):
+    """
+    iter_records(f, encoding=ENCODING) -> iterator of Records
+
+    It yields the Records of the binary file handle f, one line at a time,
+    skipping the empty lines. The BOM, if any, is removed from the first
+    line only. It raises ParseError with the line number of the first
+    line that can not be decoded or parsed.
+    """
+    first_encoding = encoding
+    if encoding.lower().replace('-', '') == 'utf8':
+        first_encoding = 'utf-8-sig'
+    for line_number, raw in enumerate(f, 1):
+        try:
+            line = raw.decode(first_encoding if line_number == 1 else encoding)
+        except UnicodeDecodeError:
+            raise ParseError("Invalid line %s: not a %s text"
+                             % (line_number, encoding))
+        line = line.strip()
+        if line:
+            yield parse_line(line, line_number)
+
+
+def iter_file(path, encoding=ENCODING):
+    """
+    iter_file(path, encoding=ENCODING) -> iterator of Records
+
+    It yields the Records of a MagicCup txt file (see iter_records),
+    adding the file path to the ParseError messages
+    """
+    with open(path, 'rb') as f:
+        try:
+            for record in iter_records(f, encoding):
+                yield record
+        except ParseError as e:
+            raise ParseError("%s: %s" % (path, e))
+
+
+def parse_file(path):
+    """
+    parse_file(path) -> list of Records
+
+    It returns all the Records of a MagicCup txt file, for the worker
+    processes of parse_files
+    """
+    return list(iter_file(path))
+
+
+def parse_files(paths, workers=1):
+    """
+    parse_files(paths, workers=1) -> iterator
+
+    It yields the Records of every file in paths, in the same order of
+    paths. With workers == 1 every file is streamed (see iter_file) and
+    must be consumed before the next one is read; with workers > 1 the
+    files are parsed by a pool of worker processes, which return the
+    Records list of every file.
+    """
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for records in executor.map(parse_file, paths):
+                yield records
+    else:
+        for path in paths:
+            yield iter_file(path)
+
+
+def count_lines(path):
+    """
+    count_lines(path) -> int
+
+    It returns the number of not empty lines of a file without decoding
+    them; it reads the whole file, so it is used only when a progress
+    total is shown
+    """
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
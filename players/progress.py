@@ -0,0 +1,179 @@
+"""
+Progress reporters for long operations (imports, statistics).
+
+The controller calls update(count) for every processed record: the call
+is a single comparison until the next percent step is reached, and the
+reporter shows the progress at most every 'interval' seconds.
+A cancelled reporter raises Cancelled from update(), so that the running
+transaction is rolled back. An operation without a total (a streamed file
+not counted in advance) is shown every UNSIZED_STEP records.
+"""
+import sys
+import time
+
+UNSIZED_STEP = 1000
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Progress:
+    def __init__(self, interval=0.1, step=1):
+        """
+        Progress(interval=0.1, step=1)
+
+        No-op progress reporter: subclasses override show(count).
+        Progress is shown at most every interval seconds and every
+        step percent of the total.
+        """
+        self.interval = interval
+        self.step = step
+        self.total = 0
+        self.text = ''
+        self.step_count = 1
+        self.next_count = 0
+        self.last_time = 0.0
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        cancel()
+
+        It asks to stop the current operation at the next update
+        """
+        self.cancelled = True
+
+    def check(self):
+        """
+        check()
+
+        It raises Cancelled if the operation has been cancelled, for the
+        steps of a job between two progress operations
+        """
+        if self.cancelled:
+            raise Cancelled("Operation cancelled")
+
+    def start(self, total, text=''):
+        """
+        start(total, text='')
+
+        It starts a new operation of total records, None if unknown
+        """
+        self.total = total or 0
+        self.text = text
+        if self.total:
+            self.step_count = max(1, int(self.total * self.step / 100))
+        else:
+            self.step_count = UNSIZED_STEP
+        self.next_count = self.step_count
+        self.show(0)
+        self.last_time = time.time()
+
+    def update(self, count):
+        """
+        update(count)
+
+        It reports that count records have been processed.
+        It raises Cancelled if the operation has been cancelled.
+        """
+        if count < self.next_count:
+            return
+        self.check()
+        self.next_count = count + self.step_count
+        now = time.time()
+        if now - self.last_time >= self.interval:
+            self.last_time = now
+            self.show(count)
+
+    def finish(self):
+        """
+        finish()
+
+        It ends the current operation showing the final count, if known
+        """
+        if self.total:
+            self.show(self.total)
+        self.clear()
+
+    def show(self, count):
+        """
+        show(count)
+
+        It shows the progress, nothing for the no-op reporter
+        """
+        pass
+
+    def clear(self):
+        """
+        clear()
+
+        It clears the progress at the end of an operation
+        """
+        pass
+
+
+class ConsoleProgress(Progress):
+    def __init__(self, stream=None, interval=0.5, step=1):
+        """
+        ConsoleProgress(stream=None, interval=0.5, step=1)
+
+        Progress reporter writing on stream (default sys.stdout)
+        """
+        super(ConsoleProgress, self).__init__(interval=interval, step=step)
+        self.stream = stream or sys.stdout
+
+    def show(self, count):
+        if self.total:
+            self.stream.write("\r%s %s/%s (%s%%)"
+                              % (self.text, count, self.total,
+                                 100 * count // self.total))
+        else:
+            self.stream.write("\r%s %s" % (self.text, count))
+        self.stream.flush()
+
+    def clear(self):
+        self.stream.write("\n")
+
+
+class ViewProgress(Progress):
+    def __init__(self, view, interval=0.1, step=1, call_after=None):
+        """
+        ViewProgress(view, interval=0.1, step=1, call_after=None)
+
+        Progress reporter updating the status bar and the gauge of the
+        Core frame view. When the operation runs on a worker thread,
+        call_after(func, *args) must run func on the main thread.
+        """
+        super(ViewProgress, self).__init__(interval=interval, step=step)
+        self.view = view
+        self.call_after = call_after
+
+    def call(self, func, *args):
+        """
+        call(func, *args)
+
+        It calls the view method func on the main thread
+        """
+        if self.call_after:
+            self.call_after(func, *args)
+        else:
+            func(*args)
+
+    def start(self, total, text=''):
+        self.call(self.view.set_range, max(total or 0, 1))
+        super(ViewProgress, self).start(total, text)
+
+    def show(self, count):
+        if self.total:
+            self.call(self.view.set_status_text,
+                      "%s %s/%s" % (self.text, count, self.total))
+            self.call(self.view.set_progress, min(count, self.total))
+        else:
+            self.call(self.view.set_status_text,
+                      "%s %s" % (self.text, count))
+        if not self.call_after:
+            self.view.Update()
+
+    def clear(self):
+        self.call(self.view.set_progress, 0)  # clear gauge
@@ -0,0 +1,93 @@
+"""
+HTML report of the players statistics.
+
+The report is built from the players avg values already computed by the
+controller and from a map of the players names loaded with one query:
+the role sections are rendered one after the other and written in order,
+one buffered chunk per section.
+"""
+import logging
+
+REPORT_NAME = "players_stat.html"
+BUFFER_SIZE = 64 * 1024
+ROLES = [("Portieri", lambda key: key < 200),
+         ("Difensori", lambda key: 200 < key < 500),
+         ("Centrocampisti", lambda key: 500 < key < 800),
+         ("Attaccanti", lambda key: key > 800)]
+
+TITLE = "<br><strong>%s</strong><br>"
+TABLE_HEADER = '''
+        <table bgcolor="#FFFFF" border="2">
+          <tr bgcolor="66CCCC" >
+            <td align=center><B>codice</B></td>
+            <td align=center width=120><B>Giocatore</B></td>
+            <td align=center width=40><B>squadra</B></td>
+            <td align=center width=60><B>media FV</B></td>
+            <td align=center width=60><B>media V</B></td>
+            <td align=center width=60><B>affidabilita'</B></td>
+            <td align=center width=60><B>valutazione</B></td>
+          </tr>
+        '''
+ROW = '''
+            <tr>
+              <td align=center>%s</td>
+              <td width=120>%s</td>
+              <td align=center>%s</td>
+              <td width=60 align=center>%s</td>
+              <td width=60 align=center>%s</td>
+              <td width=60 align=center>%s</td>
+              <td width=60 align=center>%s</td>
+            </tr>'''
+TABLE_FOOTER = '</table>'
+
+logger = logging.getLogger(__name__)
+
+
+def render_section(title, keys, d_avg, players_data):
+    """
+    render_section(title, keys, d_avg, players_data) -> string
+
+    It returns the html of the role section with the players in keys,
+    sorted by rate and then by fanta_vote avg (descending).
+    d_avg maps player.code to PlayerAvg objects, players_data maps
+    player.code to (player.name, player.real_team)
+    """
+    # metto in ordine, prima per presenze, poi per fanta media
+    keys = sorted(keys, key=lambda k: (d_avg[k].rate, d_avg[k].fv_avg),
+                  reverse=True)
+    chunks = [TITLE % title, TABLE_HEADER]
+    for key in keys:
+        data = d_avg[key]
+        name, real_team = players_data[key]
+        chunks.append(ROW % (key, name, real_team,
+                             round(float(data.fv_avg), 3),
+                             round(float(data.v_avg), 3),
+                             round(float(data.rate), 3),
+                             data.cost_indicator))
+    chunks.append(TABLE_FOOTER)
+    return ''.join(chunks)
+
+
+def generate_report(d_avg, players_data):
+    """
+    generate_report(d_avg, players_data) -> iterator
+
+    It yields (title, html) of every role section in ROLES order (see
+    render_section)
+    """
+    for title, is_role in ROLES:
+        keys = [key for key in d_avg if is_role(key)]
+        yield title, render_section(title, keys, d_avg, players_data)
+
+
+def write_report(d_avg, players_data, path=REPORT_NAME):
+    """
+    write_report(d_avg, players_data, path=REPORT_NAME)
+
+    It writes the html report to path, streaming the sections as soon
+    as they are rendered (see generate_report)
+    """
+    with open(path, "w", buffering=BUFFER_SIZE) as html:
+        for title, section in generate_report(d_avg, players_data):
+            html.write(section)
+            logger.debug("report %s successfully created", title)
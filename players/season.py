@@ -0,0 +1,114 @@
+"""
+Columnar view of the stored evaluations: dense player x day NumPy arrays
+loaded with a single query, used to recompute from scratch the running
+statistics of all the players (see Model.compute_players_stats) with
+vectorized operations instead of looping over the evaluations.
+
+The avg values shown are always read from the stored statistics (see
+Model.get_players_stats), which this full recompute rebuilds or checks.
+"""
+import numpy as np
+from players.models import Evaluation, PlayerStat
+from players.stats import RECENT_DAYS
+
+
+class SeasonMatrix:
+    def __init__(self, player_ids, days, vote, fanta_vote, cost, played):
+        """
+        SeasonMatrix(player_ids, days, vote, fanta_vote, cost, played)
+
+        Evaluations of len(player_ids) players and len(days) days:
+        player_ids: ids of the players with at least one evaluation
+        days: the imported days, sorted
+        vote, fanta_vote, cost: player x day arrays, 0 if not played
+        played: player x day boolean mask of the stored evaluations
+        """
+        self.player_ids = player_ids
+        self.days = days
+        self.vote = vote
+        self.fanta_vote = fanta_vote
+        self.cost = cost
+        self.played = played
+        # the running sums count only the evaluated days (vote > 0)
+        self.evaluated = played & (vote > 0)
+
+    @classmethod
+    def load(cls):
+        """
+        load() -> SeasonMatrix
+
+        It loads all the evaluations with a single query
+        """
+        rows = Evaluation.objects.values_list('player_id', 'day', 'vote',
+                                              'fanta_vote', 'cost')
+        data = np.array(list(rows), dtype=float).reshape(-1, 5)
+        player_ids, players = np.unique(data[:, 0].astype(int),
+                                        return_inverse=True)
+        days, day_columns = np.unique(data[:, 1].astype(int),
+                                      return_inverse=True)
+        shape = (len(player_ids), len(days))
+        vote = np.zeros(shape)
+        fanta_vote = np.zeros(shape)
+        cost = np.zeros(shape, dtype=int)
+        played = np.zeros(shape, dtype=bool)
+        vote[players, day_columns] = data[:, 2]
+        fanta_vote[players, day_columns] = data[:, 3]
+        cost[players, day_columns] = data[:, 4].astype(int)
+        played[players, day_columns] = True
+        return cls(player_ids, days, vote, fanta_vote, cost, played)
+
+    def get_last(self):
+        """
+        get_last() -> (last_day, last_cost)
+
+        It returns the last day with an evaluation of every player and
+        the cost of that evaluation
+        """
+        columns = self.played.shape[1] - 1 - np.argmax(
+            self.played[:, ::-1], axis=1)
+        rows = np.arange(len(self.player_ids))
+        return self.days[columns], self.cost[rows, columns]
+
+    def get_recent(self, size=RECENT_DAYS):
+        """
+        get_recent(size=RECENT_DAYS) -> list of strings
+
+        It returns the fanta_votes of the last size evaluated days of every
+        player, in the format of players.stats.push_recent
+        """
+        from_last = np.cumsum(self.evaluated[:, ::-1], axis=1)[:, ::-1]
+        window = self.evaluated & (from_last <= size)
+        return [' '.join(str(value) for value in values[mask].tolist())
+                for values, mask in zip(self.fanta_vote, window)]
+
+    def get_players_stats(self):
+        """
+        get_players_stats() -> dictionary
+
+        It returns a dictionary with format player.id: PlayerStat object
+        (not saved) with the running statistics of every player
+        """
+        if not len(self.player_ids):
+            return {}
+        days = self.days[None, :]
+        fanta_vote = np.where(self.evaluated, self.fanta_vote, 0.0)
+        vote = np.where(self.evaluated, self.vote, 0.0)
+        evaluated_days = np.where(self.evaluated, days, 0)
+        last_day, last_cost = self.get_last()
+        columns = (self.evaluated.sum(axis=1), fanta_vote.sum(axis=1),
+                   vote.sum(axis=1), (fanta_vote * fanta_vote).sum(axis=1),
+                   evaluated_days.sum(axis=1),
+                   (evaluated_days * days).sum(axis=1),
+                   (fanta_vote * days).sum(axis=1), last_day, last_cost)
+        stats = {}
+        for (player_id, evaluated, fv_sum, v_sum, fv_sq_sum, day_sum,
+             day_sq_sum, day_fv_sum, day, cost), recent in zip(
+                zip(self.player_ids.tolist(),
+                    *[column.tolist() for column in columns]),
+                self.get_recent()):
+            stats[player_id] = PlayerStat(
+                player_id=player_id, evaluated=evaluated, fv_sum=fv_sum,
+                v_sum=v_sum, fv_sq_sum=fv_sq_sum, day_sum=day_sum,
+                day_sq_sum=day_sq_sum, day_fv_sum=day_fv_sum, last_day=day,
+                last_cost=cost, recent=recent)
+        return stats
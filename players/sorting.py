@@ -0,0 +1,77 @@
+"""
+In-memory sorted views of the rows shown by the list controls.
+
+The rows are typed tuples built once from the database; every column
+order is computed at the first request and then reused, so sorting by
+a column again costs nothing until the data changes and the controller
+builds new rows.
+"""
+
+
+class SortedRows:
+    def __init__(self, rows, descending=(), formats=None):
+        """
+        SortedRows(rows, descending=(), formats=None)
+
+        Sortable list of row tuples. The columns in descending are sorted
+        in descending order by default. formats maps a column to the
+        function returning its text from the whole row, by default the
+        column value is shown as it is.
+        """
+        self.rows = list(rows)
+        self.descending = descending
+        self.formats = formats or {}
+        self.orders = {}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def is_descending(self, column):
+        """
+        is_descending(column) -> boolean
+
+        It returns True if column is sorted in descending order by default
+        """
+        return column in self.descending
+
+    def get_order(self, column, reverse=None):
+        """
+        get_order(column, reverse=None) -> list of row indexes
+
+        It returns the indexes of the rows sorted by column, computed only
+        at the first call. If reverse is None the default order of the
+        column is used.
+        """
+        if reverse is None:
+            reverse = self.is_descending(column)
+        order = self.orders.get((column, reverse))
+        if order is None:
+            rows = self.rows
+            order = sorted(range(len(rows)),
+                           key=lambda index: rows[index][column],
+                           reverse=reverse)
+            self.orders[(column, reverse)] = order
+        return order
+
+    def get_sorted(self, column, reverse=None):
+        """
+        get_sorted(column, reverse=None) -> list of rows
+
+        It returns the rows sorted by column (see get_order)
+        """
+        return [self.rows[index] for index in self.get_order(column, reverse)]
+
+    def get_text(self, index, column):
+        """
+        get_text(index, column) -> string
+
+        It returns the text shown for column of the row at index
+        """
+        row = self.rows[index]
+        format_row = self.formats.get(column)
+        if format_row:
+            return format_row(row)
+        return str(row[column])
@@ -0,0 +1,45 @@
+"""
+Startup timing breakdown printed by 'python main.py --profile-startup'.
+"""
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self, enabled=False, stream=None, start=None):
+        """
+        StartupTimer(enabled=False, stream=None, start=None)
+
+        It records the time spent by every startup step since start
+        (default now). A disabled timer records nothing.
+        """
+        self.enabled = enabled
+        self.stream = stream or sys.stdout
+        self.start = self.last = start or time.perf_counter()
+        self.steps = []
+
+    def mark(self, step):
+        """
+        mark(step)
+
+        It records the time elapsed since the previous step
+        """
+        if self.enabled:
+            now = time.perf_counter()
+            self.steps.append((step, now - self.last))
+            self.last = now
+
+    def report(self):
+        """
+        report()
+
+        It writes the recorded steps and the total startup time
+        """
+        if not self.enabled:
+            return
+        self.stream.write("startup times:\n")
+        for step, seconds in self.steps:
+            self.stream.write("  %-30s %8.1f ms\n" % (step, seconds * 1000))
+        self.stream.write("  %-30s %8.1f ms\n"
+                          % ('total', (self.last - self.start) * 1000))
+        self.stream.flush()
@@ -0,0 +1,201 @@
+"""
+Players statistics helpers: the running statistics updated as the days
+are imported and the typed avg values shown by the list controls and
+the report.
+
+The values are kept as numbers and formatted only when shown, so
+sorting by any column never parses strings.
+"""
+import math
+
+RECENT_DAYS = 5  # evaluated days of the recent form
+FORM_ALPHA = 0.3  # weight of the last fanta_vote in the weighted form
+
+
+def push_recent(recent, fanta_vote, size=RECENT_DAYS):
+    """
+    push_recent(recent, fanta_vote, size=RECENT_DAYS) -> string
+
+    It adds fanta_vote to the recent values string, i.e. '6.5 7.0 5.5',
+    keeping the last size values only
+    """
+    values = recent.split()[-(size - 1):] if size > 1 else []
+    values.append(str(fanta_vote))
+    return ' '.join(values)
+
+
+def parse_recent(recent):
+    """
+    parse_recent(recent) -> list of floats
+
+    It returns the values of a recent values string (see push_recent)
+    """
+    return [float(value) for value in recent.split()]
+
+
+def get_form(values, alpha=FORM_ALPHA):
+    """
+    get_form(values, alpha=FORM_ALPHA) -> float
+
+    It returns the exponentially weighted avg of values, oldest first
+    (i.e. the recent fanta_votes, see parse_recent), 0.0 if there are
+    no values
+    """
+    form = values[0] if values else 0.0
+    for value in values[1:]:
+        form = alpha * value + (1 - alpha) * form
+    return form
+
+
+def count_evaluation(stat, day, vote, fanta_vote, sign=1):
+    """
+    count_evaluation(stat, day, vote, fanta_vote, sign=1)
+
+    It adds (sign=1) or subtracts (sign=-1) an evaluation to the sums of
+    the running statistics stat (a PlayerStat object), whatever its day.
+    Only the evaluated days (vote > 0) are counted.
+    """
+    if vote <= 0:
+        return
+    stat.evaluated += sign
+    if not stat.evaluated:  # no rounding residue
+        stat.fv_sum = stat.v_sum = stat.fv_sq_sum = stat.day_fv_sum = 0.0
+        stat.day_sum = stat.day_sq_sum = 0
+        return
+    stat.fv_sum += sign * fanta_vote
+    stat.v_sum += sign * vote
+    stat.fv_sq_sum += sign * fanta_vote * fanta_vote
+    stat.day_sum += sign * day
+    stat.day_sq_sum += sign * day * day
+    stat.day_fv_sum += sign * day * fanta_vote
+
+
+def add_evaluation(stat, day, vote, fanta_vote, cost):
+    """
+    add_evaluation(stat, day, vote, fanta_vote, cost)
+
+    It updates the running statistics stat (a PlayerStat object) with
+    an evaluation more recent than all the ones already counted
+    """
+    count_evaluation(stat, day, vote, fanta_vote)
+    if vote > 0:
+        stat.recent = push_recent(stat.recent, fanta_vote)
+    stat.last_day = day
+    stat.last_cost = cost
+
+
+def get_std(count, total, squares_total):
+    """
+    get_std(count, total, squares_total) -> float
+
+    It returns the standard deviation of count values from their sum
+    and the sum of their squares
+    """
+    if not count:
+        return 0.0
+    mean = total / count
+    return math.sqrt(max(squares_total / count - mean * mean, 0.0))
+
+
+def get_trend(count, day_sum, fv_sum, day_fv_sum, day_sq_sum):
+    """
+    get_trend(count, day_sum, fv_sum, day_fv_sum, day_sq_sum) -> float
+
+    It returns the slope of the least squares line of fanta_vote over
+    the days, in fanta_vote points per day
+    """
+    denominator = count * day_sq_sum - day_sum * day_sum
+    if count < 2 or not denominator:
+        return 0.0
+    return (count * day_fv_sum - day_sum * fv_sum) / float(denominator)
+
+
+def format_cost(last_cost, delta_cost):
+    """
+    format_cost(last_cost, delta_cost) -> string
+
+    It returns the last cost followed by the difference from the initial
+    cost, i.e. '15 (+2)', or '15 (-)' if delta_cost is None
+    """
+    if delta_cost is None:
+        return '%s (-)' % last_cost
+    if delta_cost > 0:
+        return '%s (+%s)' % (last_cost, delta_cost)
+    return '%s (%s)' % (last_cost, delta_cost)
+
+
+class PlayerAvg:
+    __slots__ = ('fv_avg', 'v_avg', 'rate', 'last_cost', 'delta_cost',
+                 'recent_avg', 'form', 'trend', 'std')
+
+    def __init__(self, fv_avg, v_avg, rate, last_cost, delta_cost=None):
+        """
+        PlayerAvg(fv_avg, v_avg, rate, last_cost, delta_cost=None)
+
+        Avg values of a player:
+        fv_avg: avg of player.fanta_vote
+        v_avg: avg of player.vote
+        rate: rate evaluated match / played match
+        last_cost: cost of the last imported day, the player cost if the
+                   player has no evaluation in that day
+        delta_cost: difference between last_cost and the player cost,
+                    None if the player has no evaluation in the last
+                    imported day
+        The form values are set by set_form.
+        """
+        self.fv_avg = fv_avg
+        self.v_avg = v_avg
+        self.rate = rate
+        self.last_cost = last_cost
+        self.delta_cost = delta_cost
+        self.recent_avg = self.form = self.trend = self.std = 0.0
+
+    def set_form(self, recent_avg, form, trend, std):
+        """
+        set_form(recent_avg, form, trend, std)
+
+        It sets the form values of the player:
+        recent_avg: avg fanta_vote of the last RECENT_DAYS evaluated days
+        form: exponentially weighted fanta_vote of the same days
+              (see get_form)
+        trend: fanta_vote points per day of the least squares line
+        std: standard deviation of fanta_vote
+        """
+        self.recent_avg = recent_avg
+        self.form = form
+        self.trend = trend
+        self.std = std
+
+    def get_values(self):
+        """
+        get_values() -> tuple
+
+        It returns all the values of the record, in __slots__ order
+        """
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    @classmethod
+    def from_values(cls, values):
+        """
+        from_values(values) -> PlayerAvg
+
+        It returns the record with the values returned by get_values
+        """
+        avg = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            setattr(avg, name, value)
+        return avg
+
+    @property
+    def cost_indicator(self):
+        """
+        cost_indicator -> string
+
+        The formatted last cost, i.e. '15 (+2)' (see format_cost)
+        """
+        return format_cost(self.last_cost, self.delta_cost)
+
+    def __repr__(self):
+        return 'PlayerAvg(%r, %r, %r, %r, %r)' % (
+            self.fv_avg, self.v_avg, self.rate, self.last_cost,
+            self.delta_cost)
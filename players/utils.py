@@ -0,0 +1,18 @@
+"""
+Small helpers shared by the parser, the ORM model, the importer and the
+export, with no django dependency.
+"""
+from itertools import islice
+
+
+def chunks(iterable, size):
+    """
+    chunks(iterable, size) -> iterator of lists
+
+    It yields the items of iterable in lists of at most size items
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
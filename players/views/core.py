@@ -1,22 +1,20 @@
 import os
+import threading
 import wx
-from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
+from players.export import FORMATS as EXPORT_FORMATS
+from players.stats import RECENT_DAYS
+from players.views.listctrl import VirtualListCtrl
 from players.views.player import ViewPlayer, ViewPlayerSummary
 from players.views.evaluation import ViewEvaluation, ViewEvaluationSummary
 from players.views.styles import OK
 
 
-class AutoWidthListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
-    def __init__(self, parent):
-        wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_REPORT)
-        ListCtrlAutoWidthMixin.__init__(self)
-
-
 class Core(wx.Frame):
     def __init__(self, parent, controller, title):
         super(Core, self).__init__(parent=parent, title=title)
         self.parent = parent
         self.controller = controller
+        self.busy_widgets = []  # widgets disabled by set_busy
         self.panel = PanelCore(self)
         self.panel.SetBackgroundColour('LightGray')
         self.status_bar = self.CreateStatusBar(2)
@@ -33,10 +31,14 @@ class Core(wx.Frame):
         self.m_new_player = m_player.Append(200, "New Player", "New Player")
         self.m_players_summary = m_player.Append(201, "Summary", "Summary")
         self.m_stat = m_player.Append(202, "Statistic", "Statistic")
+        self.m_players_export = m_player.Append(208, "Export statistics",
+                                                "Export statistics")
         m_ev = wx.Menu()
         self.menubar.Append(m_ev, "Evaluations")
         self.m_new_ev = m_ev.Append(203, "New Evaluation", "New Evaluation")
         self.m_ev_summary = m_ev.Append(204, "Summary", "Summary")
+        self.m_ev_export = m_ev.Append(209, "Export evaluations",
+                                       "Export evaluations")
         m_import = wx.Menu()
         self.menubar.Append(m_import, "Import")
         self.m_ev_import = m_import.Append(205, "import evaluations",
@@ -55,18 +57,21 @@ class Core(wx.Frame):
         self.Bind(wx.EVT_MENU, self.on_import_player, self.m_players_import)
         self.Bind(wx.EVT_MENU, self.on_players_summary, self.m_players_summary)
         self.Bind(wx.EVT_MENU, self.on_statistic, self.m_stat)
+        self.Bind(wx.EVT_MENU, self.on_export_players, self.m_players_export)
         self.Bind(wx.EVT_MENU, self.new_evaluation, self.m_new_ev)
         self.Bind(wx.EVT_MENU, self.on_import_evaluation, self.m_ev_import)
         self.Bind(wx.EVT_MENU, self.on_evs_summary, self.m_ev_summary)
+        self.Bind(wx.EVT_MENU, self.on_export_evaluations, self.m_ev_export)
         self.Bind(wx.EVT_MENU, self.on_delete_data, self.m_delete)
         self.Bind(wx.EVT_BUTTON, self.on_quit, self.panel.btn_quit)
         self.Bind(wx.EVT_BUTTON, self.on_refresh, self.panel.btn_refresh)
+        self.Bind(wx.EVT_BUTTON, self.on_cancel, self.panel.btn_cancel)
         self.Bind(wx.EVT_LIST_COL_CLICK, self.on_list_column,
                   self.panel.players)
         self.Bind(wx.EVT_LIST_ITEM_SELECTED, self.on_edit,
                   self.panel.players)
         self.Bind(wx.EVT_SIZE, self.on_size)
-        size = (600, 600)
+        size = (800, 600)
         self.SetSize(size)
         self.Centre()
         self.Show()
@@ -120,6 +125,67 @@ class Core(wx.Frame):
         """
         self.status_bar.SetStatusText(value)
 
+    @staticmethod
+    def call_after(func, *args):
+        """
+        call_after(func, *args)
+
+        It calls func(*args) on the main thread, it can be called by
+        worker threads
+        """
+        wx.CallAfter(func, *args)
+
+    def run_job(self, job, on_done):
+        """
+        run_job(job, on_done)
+
+        It runs job() on a worker thread and calls on_done(result, error)
+        on the main thread when the job ends
+        """
+        def worker():
+            result = error = None
+            try:
+                result = job()
+            except Exception as e:
+                error = e
+            wx.CallAfter(on_done, result, error)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def set_busy(self, busy=True, cancellable=False):
+        """
+        set_busy(busy=True, cancellable=False)
+
+        It disables the menus, the roles radio box, the refresh button and
+        the players list while a job is running on a worker thread and
+        enables the cancel button if the job can be cancelled. When the
+        job ends only the widgets enabled before are enabled again.
+        """
+        for index in range(self.menubar.GetMenuCount()):
+            self.menubar.EnableTop(index, not busy)
+        if busy:
+            widgets = (self.panel.rb_roles, self.panel.btn_refresh,
+                       self.panel.players)
+            self.busy_widgets = [widget for widget in widgets
+                                 if widget.IsEnabled()]
+            for widget in self.busy_widgets:
+                widget.Disable()
+        else:
+            for widget in self.busy_widgets:
+                widget.Enable()
+            self.busy_widgets = []
+        self.panel.btn_cancel.Enable(busy and cancellable)
+
+    # noinspection PyUnusedLocal
+    def on_cancel(self, event):
+        """
+        on_cancel(event) -> None
+
+        Callback bound to 'cancel' button which stops the running job
+        rolling back its changes
+        """
+        self.set_status_text('Cancelling...')
+        self.controller.cancel_job()
+
     # noinspection PyUnusedLocal
     def on_quit(self, event):
         """
@@ -147,11 +213,10 @@ class Core(wx.Frame):
         list control
         """
         role = self.panel.rb_roles.GetStringSelection()
-        self.panel.players.DeleteAllItems()
-        players = self.controller.get_players_by_role(role)
-        if players:
-            self.set_status_text("%s players found" % len(players))
-            self.fill_players(players)
+        rows = self.controller.get_players_rows(role)
+        self.fill_players(rows)
+        if rows:
+            self.set_status_text("%s players found" % len(rows))
         else:
             self.set_status_text('No players found')
 
@@ -162,39 +227,16 @@ class Core(wx.Frame):
         Callback bound to 'list_control' widget wich sorts shown values by
         column value
         """
-        role = self.panel.rb_roles.GetStringSelection()
-        self.panel.players.DeleteAllItems()
-        id_column = event.GetColumn()
-        players = self.controller.get_sorted_players(id_column, role)
-        if players:
-            self.fill_players(players)
-        else:
-            self.set_status_text('No players found')
+        self.panel.players.sort(event.GetColumn())
 
-    def fill_players(self, players):
+    def fill_players(self, rows):
         """
-        fill_players(players) -> None
+        fill_players(rows) -> None
 
-        It fills list_control with player values and relatives avg values
+        It fills list_control with the players rows built by the
+        controller (see Controller.get_players_rows)
         """
-        avg_data = self.controller.get_avg_dict()
-        for player in players:
-            try:
-                avg_fv, avg_v, rate, d_cost = avg_data.get(player.code)
-            except TypeError:
-                self.set_status_text('No data to show')
-            except ValueError:
-                self.set_status_text(
-                    'Invalid file format: file strings must be:'
-                    '\n nnn|NAME|TEAM|n.n|n.n|n')
-            else:
-                index = self.panel.players.InsertItem(10000, str(player.code))
-                self.panel.players.SetItem(index, 1, str(player.name))
-                self.panel.players.SetItem(index, 2, str(player.real_team))
-                self.panel.players.SetItem(index, 3, str(avg_fv))
-                self.panel.players.SetItem(index, 4, str(avg_v))
-                self.panel.players.SetItem(index, 5, str(rate))
-                self.panel.players.SetItem(index, 6, str(d_cost))
+        self.panel.players.set_rows(rows)
 
     # Player section
     # noinspection PyUnusedLocal
@@ -222,7 +264,7 @@ class Core(wx.Frame):
         if players:
             child = ViewPlayerSummary(parent=self, title='Players Summary')
             wx.CallAfter(child.Show)
-            child.fill_player_list(players)
+            child.on_refresh(None)  # rows of the selected role
         else:
             self.show_message("No players in database, please import them")
 
@@ -236,6 +278,29 @@ class Core(wx.Frame):
         """
         self.controller.build_report()
 
+    # noinspection PyUnusedLocal
+    def on_export_players(self, event):
+        """
+        on_export_players(event) -> None
+
+        Callback bound to the 'export statistics' player menu. It opens a
+        file browser to choose the csv, jsonl or npz file to write
+        """
+        self.export('players')
+
+    def export(self, data):
+        """
+        export(data) -> None
+
+        It asks the file to write and exports data ('players' or
+        'evaluations') to it
+        """
+        output_file, file_format = self.get_export_file()
+        if output_file:
+            self.controller.export_data(data, output_file, file_format)
+        else:
+            self.set_status_text('No file selected!')
+
     # noinspection PyUnusedLocal
     def on_delete_data(self, event):
         """
@@ -247,7 +312,7 @@ class Core(wx.Frame):
                                'warning', wx.YES_NO | wx.ICON_WARNING)
         if choice == wx.YES:
             self.controller.delete_all_data()
-            self.panel.players.DeleteAllItems()
+            self.panel.players.clear()
             self.set_status_text('All data deleted!')
             self.m_ev_import.Enable(False)
             self.m_players_import.Enable(True)
@@ -263,7 +328,6 @@ class Core(wx.Frame):
         input_file = self.get_file(extension="txt")
         if input_file:
             self.controller.import_players(input_file)
-            self.m_players_import.Enable(False)
         else:
             self.set_status_text('No file selected!')
 
@@ -311,6 +375,16 @@ class Core(wx.Frame):
         else:
             self.show_message("No evaluations in database, please import them")
 
+    # noinspection PyUnusedLocal
+    def on_export_evaluations(self, event):
+        """
+        on_export_evaluations(event) -> None
+
+        Callback bound to the 'export evaluations' menu. It opens a
+        file browser to choose the csv, jsonl or npz file to write
+        """
+        self.export('evaluations')
+
     # noinspection PyUnusedLocal
     def on_edit(self, event):
         """
@@ -320,7 +394,7 @@ class Core(wx.Frame):
         update player values when click on a listcontrol row
         """
         self.Disable()
-        code = event.GetItem().GetText()
+        code = self.panel.players.get_row(event.GetIndex())[0]
         player = self.controller.get_player_by_code(code)
         self.controller.set_temporary_object(player)
         child = ViewPlayer(self, "Edit player", is_editor=True)
@@ -352,6 +426,24 @@ class Core(wx.Frame):
         browser.Destroy()
         return input_file
 
+    def get_export_file(self):
+        """
+        get_export_file() -> (path, format)
+
+        Call wx.FileDialog to choose the export file and its format
+        """
+        output_file = file_format = ""
+        wildcard = "|".join("%s file (*.%s)|*.%s" % (ext.upper(), ext, ext)
+                            for ext in EXPORT_FORMATS)
+        browser = wx.FileDialog(parent=self, message='Export to file',
+                                defaultDir=os.getcwd(), wildcard=wildcard,
+                                style=wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT)
+        if browser.ShowModal() == wx.ID_OK:
+            output_file = browser.GetPath()
+            file_format = EXPORT_FORMATS[browser.GetFilterIndex()]
+        browser.Destroy()
+        return output_file, file_format
+
 
 class PanelCore(wx.Panel):
     def __init__(self, parent):
@@ -361,7 +453,7 @@ class PanelCore(wx.Panel):
         self.rb_roles = wx.RadioBox(self, -1, "role", choices=roles,
                                     majorDimension=1, style=wx.RA_SPECIFY_COLS)
 
-        self.players = AutoWidthListCtrl(self)
+        self.players = VirtualListCtrl(self)
         self.players.InsertColumn(0, 'code', wx.LIST_FORMAT_RIGHT, 50)
         self.players.InsertColumn(1, 'name', width=125)
         self.players.InsertColumn(2, 'real team', width=50)
@@ -369,13 +461,20 @@ class PanelCore(wx.Panel):
         self.players.InsertColumn(4, 'dv', width=50)
         self.players.InsertColumn(5, 'rate', width=50)
         self.players.InsertColumn(6, 'cost', width=50)
+        self.players.InsertColumn(7, 'last %s' % RECENT_DAYS, width=50)
+        self.players.InsertColumn(8, 'form', width=50)
+        self.players.InsertColumn(9, 'trend', width=50)
+        self.players.InsertColumn(10, 'std', width=50)
         players_box = wx.BoxSizer(wx.HORIZONTAL)
         players_box.Add(self.players, 1, wx.EXPAND)
         btn_sizer = wx.FlexGridSizer(rows=1, cols=3, hgap=5, vgap=5)
         self.btn_quit = wx.Button(self, wx.ID_CANCEL, label="Quit")
         self.btn_refresh = wx.Button(self, wx.ID_OK, label="Refresh")
+        self.btn_cancel = wx.Button(self, wx.ID_STOP, label="Cancel")
+        self.btn_cancel.Disable()
         btn_sizer.Add(self.btn_quit, 0, wx.EXPAND)
         btn_sizer.Add(self.btn_refresh, 0, wx.EXPAND)
+        btn_sizer.Add(self.btn_cancel, 0, wx.EXPAND)
 
         sizer = wx.BoxSizer(wx.VERTICAL)
         sizer.Add(self.rb_roles, 0, wx.EXPAND | wx.ALL, 5)
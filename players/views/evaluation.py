@@ -1,6 +1,5 @@
 import wx
-import sys
-from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
+from players.views.listctrl import VirtualListCtrl
 from players.views.styles import OK, ACV, DD, YN
 
 
@@ -136,12 +135,6 @@ class PanelEvaluation(wx.Panel):
         self.SetSizer(sizer)
 
 
-class AutoWidthListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
-    def __init__(self, parent):
-        wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_REPORT)
-        ListCtrlAutoWidthMixin.__init__(self)
-
-
 class ViewEvaluationSummary(wx.Frame):
     def __init__(self, parent, title):
         self.parent = parent
@@ -171,39 +164,24 @@ class ViewEvaluationSummary(wx.Frame):
         Callback bound to 'refresh' button which refreshes values shown by
         list control
         """
-        self.panel.evaluation_list.DeleteAllItems()
         role = self.panel.rb_roles.GetStringSelection()
         day = self.panel.cb_days.GetStringSelection()
         if day:
-            evaluations = self.controller.get_evaluations(role=role, day=day)
-            if evaluations:
-                self.fill_evaluation_list(evaluations)
-            else:
+            rows = self.controller.get_evaluations_rows(role=role, day=day)
+            self.fill_evaluation_list(rows)
+            if not rows:
                 self.show_message('No evaluations with day %s found!' % day)
         else:
             self.show_message('Please choose a Day to show')
 
-    def fill_evaluation_list(self, evaluations):
+    def fill_evaluation_list(self, rows):
         """
-        fill_evaluation_list(evaluations) -> None
+        fill_evaluation_list(rows) -> None
 
-        It fills list control with evaluation values
+        It fills list control with the evaluations rows built by the
+        controller (see Controller.get_evaluations_rows)
         """
-        for evaluation in evaluations:
-            index = self.panel.evaluation_list.InsertItem(
-                sys.maxsize, str(evaluation.player.code))
-            self.panel.evaluation_list.SetItem(
-                index, 1, str(evaluation.player.name))
-            self.panel.evaluation_list.SetItem(
-                index, 2, str(evaluation.player.real_team))
-            self.panel.evaluation_list.SetItem(
-                index, 3, str(evaluation.fanta_vote))
-            self.panel.evaluation_list.SetItem(
-                index, 4, str(evaluation.vote))
-            self.panel.evaluation_list.SetItem(
-                index, 5, str(evaluation.cost))
-            self.panel.evaluation_list.SetItem(
-                index, 6, str(evaluation.day))
+        self.panel.evaluation_list.set_rows(rows)
 
     # noinspection PyUnusedLocal
     def on_edit(self, event):
@@ -213,7 +191,7 @@ class ViewEvaluationSummary(wx.Frame):
         Callback bound to 'list control' widget which opens the edit frame to
         update evaluation values when click on a list control row
         """
-        code = event.GetItem().GetText()
+        code = self.panel.evaluation_list.get_row(event.GetIndex())[0]
         day = self.panel.cb_days.GetStringSelection()
         evaluation = self.controller.get_evaluation(int(code), int(day))
         self.controller.set_temporary_object(evaluation)
@@ -241,17 +219,8 @@ class ViewEvaluationSummary(wx.Frame):
         Callback bound to 'list control' widget which sorts shown values by
         column value
         """
-        role = self.panel.rb_roles.GetStringSelection()
-        day = self.panel.cb_days.GetStringSelection()
-        if day:
-            self.panel.evaluation_list.DeleteAllItems()
-            id_c = event.GetColumn()
-            evaluations = self.controller.get_sorted_evaluations(id_c, role,
-                                                                 day)
-            if evaluations:
-                self.fill_evaluation_list(evaluations)
-            else:
-                self.show_message('No evaluations found')
+        if self.panel.cb_days.GetStringSelection():
+            self.panel.evaluation_list.sort(event.GetColumn())
         else:
             self.show_message("Please choose a day")
 
@@ -285,7 +254,7 @@ class PanelEvaluationSummary(wx.Panel):
         days = parent.controller.get_days()
         self.cb_days = wx.ComboBox(self, -1, "", choices=days, style=DD)
 
-        self.evaluation_list = AutoWidthListCtrl(self)
+        self.evaluation_list = VirtualListCtrl(self)
         self.evaluation_list.InsertColumn(0, 'code', wx.LIST_FORMAT_RIGHT, 75)
         self.evaluation_list.InsertColumn(1, 'name', width=150)
         self.evaluation_list.InsertColumn(2, 'team', width=50)
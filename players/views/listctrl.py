@@ -0,0 +1,72 @@
+import wx
+from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
+from players.sorting import SortedRows
+
+
+class VirtualListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
+    def __init__(self, parent):
+        """
+        VirtualListCtrl(parent)
+
+        Virtual list control showing a players.sorting.SortedRows object:
+        only the visible rows are formatted (see OnGetItemText) and sorting
+        only swaps the list of row indexes shown.
+        """
+        wx.ListCtrl.__init__(self, parent, -1,
+                             style=wx.LC_REPORT | wx.LC_VIRTUAL)
+        ListCtrlAutoWidthMixin.__init__(self)
+        self.rows = SortedRows([])
+        self.indexes = []
+        self.sorted_column = None
+        self.reverse = False
+
+    def set_rows(self, rows):
+        """
+        set_rows(rows)
+
+        It shows the SortedRows object (or the row tuples) passed as
+        argument, keeping the last sort order
+        """
+        if not isinstance(rows, SortedRows):
+            rows = SortedRows(rows)
+        self.rows = rows
+        if self.sorted_column is None:
+            self.indexes = range(len(rows))
+        else:
+            self.indexes = rows.get_order(self.sorted_column, self.reverse)
+        self.SetItemCount(len(rows))
+        self.Refresh()
+
+    def get_row(self, item):
+        """
+        get_row(item) -> tuple
+
+        It returns the row tuple shown at position item
+        """
+        return self.rows[self.indexes[item]]
+
+    def sort(self, column):
+        """
+        sort(column)
+
+        It sorts the rows by column, toggling the order when the same
+        column is sorted again
+        """
+        if column == self.sorted_column:
+            self.reverse = not self.reverse
+        else:
+            self.sorted_column = column
+            self.reverse = self.rows.is_descending(column)
+        self.indexes = self.rows.get_order(column, self.reverse)
+        self.Refresh()
+
+    def clear(self):
+        """
+        clear()
+
+        It removes all the rows
+        """
+        self.set_rows([])
+
+    def OnGetItemText(self, item, column):
+        return self.rows.get_text(self.indexes[item], column)
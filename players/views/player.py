@@ -1,5 +1,5 @@
 import wx
-from wx.lib.mixins.listctrl import ListCtrlAutoWidthMixin
+from players.views.listctrl import VirtualListCtrl
 from players.views.styles import OK, ACV, YN, DD
 
 
@@ -139,12 +139,6 @@ class PanelPlayer(wx.Panel):
         self.SetSizer(sizer)
 
 
-class AutoWidthListCtrl(wx.ListCtrl, ListCtrlAutoWidthMixin):
-    def __init__(self, parent):
-        wx.ListCtrl.__init__(self, parent, -1, style=wx.LC_REPORT)
-        ListCtrlAutoWidthMixin.__init__(self)
-
-
 class ViewPlayerSummary(wx.Frame):
     def __init__(self, parent, title):
         self.parent = parent
@@ -183,26 +177,20 @@ class ViewPlayerSummary(wx.Frame):
         Callback bound to 'refresh' button which refreshes values shown by
         list control
         """
-        self.panel.player_list.DeleteAllItems()
         role = self.panel.rb_roles.GetStringSelection()
-        players = self.controller.get_players_by_role(role)
-        if players:
-            self.fill_player_list(players)
-        else:
+        rows = self.controller.get_players_summary_rows(role)
+        self.fill_player_list(rows)
+        if not rows:
             self.show_message('No players found')
 
-    def fill_player_list(self, players):
+    def fill_player_list(self, rows):
         """
-        fill_player_list(players) -> None
+        fill_player_list(rows) -> None
 
-        It fills list control with player values
+        It fills list control with the players rows built by the
+        controller (see Controller.get_players_summary_rows)
         """
-        for player in players:
-            index = self.panel.player_list.InsertItem(10000, str(player.code))
-            self.panel.player_list.SetItem(index, 1, str(player.name))
-            self.panel.player_list.SetItem(index, 2, str(player.real_team))
-            self.panel.player_list.SetItem(index, 3, str(player.role))
-            self.panel.player_list.SetItem(index, 4, str(player.cost))
+        self.panel.player_list.set_rows(rows)
 
     # noinspection PyUnusedLocal
     def on_edit(self, event):
@@ -212,7 +200,7 @@ class ViewPlayerSummary(wx.Frame):
         Callback bound to 'list control' widget which opens the edit frame to
         update player values when click on a list control row
         """
-        code = event.GetItem().GetText()
+        code = self.panel.player_list.get_row(event.GetIndex())[0]
         player = self.controller.get_player_by_code(code)
         role = self.panel.rb_roles.GetStringSelection()
         self.controller.set_temporary_object(player)
@@ -237,17 +225,7 @@ class ViewPlayerSummary(wx.Frame):
         Callback bound to 'list control' widget which sorts shown values by
         column value
         """
-        role = self.panel.rb_roles.GetStringSelection()
-        self.panel.player_list.DeleteAllItems()
-        id_column = event.GetColumn()
-        if id_column == 4:
-            players = self.controller.get_sorted_players_by_cost(role)
-        else:
-            players = self.controller.get_sorted_players(id_column, role)
-        if players:
-            self.fill_player_list(players)
-        else:
-            self.show_message('No players found')
+        self.panel.player_list.sort(event.GetColumn())
 
     @staticmethod
     def show_message(string):
@@ -265,7 +243,7 @@ class PanelPlayerSummary(wx.Panel):
         roles = ('goalkeeper', 'defender', 'midfielder', 'forward')
         self.rb_roles = wx.RadioBox(self, -1, "roles", choices=roles,
                                     majorDimension=1, style=wx.RA_SPECIFY_COLS)
-        self.player_list = AutoWidthListCtrl(self)
+        self.player_list = VirtualListCtrl(self)
         self.player_list.InsertColumn(0, 'code', wx.LIST_FORMAT_RIGHT, 75)
         self.player_list.InsertColumn(1, 'name', width=150)
         self.player_list.InsertColumn(2, 'team', width=50)
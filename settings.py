@@ -9,8 +9,45 @@ DATABASES = {
     }
 }
 
+# PRAGMAs executed on every new sqlite connection, see players/db.py
+SQLITE_PROFILE = 'performance'
+SQLITE_PROFILES = {
+    'default': {},
+    'performance': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,  # KiB
+        'mmap_size': 268435456,  # bytes
+        'temp_store': 'MEMORY',
+    },
+}
+
+# players avg values cache, None for a file next to the database
+STATS_CACHE = None
+
+# rows written by every bulk insert, 0 to write the whole list at once
+BULK_BATCH_SIZE = 500
+
+# record calls, time and queries of the Model methods and of the main
+# operations, writing a summary at exit (see players/instrument.py)
+INSTRUMENT = False
+
+# INFO records are one per operation (import, stats, report), DEBUG ones
+# are written for every row
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {'format': '%(levelname)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+    },
+    'root': {'handlers': ['console'], 'level': 'INFO'},
+}
+
 INSTALLED_APPS = (
-    'players',
+    'players.apps.PlayersConfig',
     )
 
 SECRET_KEY = 'mysecretkey'